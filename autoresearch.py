@@ -5,6 +5,7 @@ AutoResearch Agent Wrapper for Streamlit
 import asyncio
 import sys
 import os
+import threading
 
 # Add all necessary paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -24,7 +25,7 @@ except ImportError as e:
         def __init__(self):
             pass
         
-        async def research(self, topic: str) -> dict:
+        async def research(self, topic: str, title: str = None) -> dict:
             """Simplified research for demo purposes."""
             import time
             await asyncio.sleep(2)  # Simulate processing
@@ -59,12 +60,26 @@ While challenges remain, the future of {topic.lower()} appears bright with conti
                 "research_facts": 12
             }
 
+from tools.clients import run_sync
+
+_agent = None
+_agent_lock = threading.Lock()
+
+def get_agent() -> AutoResearchAgent:
+    """Return the process-wide agent, building its graph and clients once."""
+    global _agent
+    
+    with _agent_lock:
+        if _agent is None:
+            _agent = AutoResearchAgent()
+        return _agent
+
 # Main function for Streamlit
 async def run_research(topic: str, custom_title: str = None):
     """Run research and return results."""
     try:
-        agent = AutoResearchAgent()
-        result = await agent.research(topic)
+        agent = get_agent()
+        result = await agent.research(topic, title=custom_title)
         
         if custom_title and result.get("success"):
             result["title"] = custom_title
@@ -79,5 +94,5 @@ async def run_research(topic: str, custom_title: str = None):
         }
 
 def run_research_sync(topic: str, custom_title: str = None):
-    """Synchronous wrapper for async research."""
-    return asyncio.run(run_research(topic, custom_title))
\ No newline at end of file
+    """Synchronous wrapper for async research, run on the shared event loop."""
+    return run_sync(run_research(topic, custom_title))
\ No newline at end of file
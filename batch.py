@@ -0,0 +1,103 @@
+"""
+Batch research: read topics from a JSONL file, research them concurrently and
+write one JSONL result per job as soon as it finishes.
+
+Each input line is a JSON object with a "topic" and optionally a custom "title"
+and an "id" that is copied to the output.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+from autoresearch import get_agent
+from tools.rate_limiter import format_rate_limit_stats
+from config import Config
+
+def load_jobs(input_path: str) -> List[Dict[str, Any]]:
+    """Read batch jobs from a JSONL file, keeping malformed lines as failed jobs."""
+    jobs = []
+    with open(input_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                if isinstance(job, str):
+                    job = {"topic": job}
+                if not job.get("topic"):
+                    raise ValueError("missing 'topic'")
+                job["line"] = line_number
+            except (ValueError, AttributeError) as e:
+                job = {"line": line_number, "error": f"Invalid job: {e}"}
+            jobs.append(job)
+    return jobs
+
+async def run_batch(input_path: str, output_path: str,
+                    concurrency: int = Config.BATCH_MAX_CONCURRENCY, fresh: bool = False) -> dict:
+    """Research every job in input_path, at most `concurrency` at a time.
+    
+    Jobs run on the process-wide agent from autoresearch.get_agent(), so search,
+    page and LLM caches, the checkpointer and the HTTP and LLM clients are
+    shared with the batch and with any other runs in the process.
+    """
+    jobs = load_jobs(input_path)
+    # Built off the event loop, since building it may download the tokenizer
+    agent = await asyncio.to_thread(get_agent)
+    limit = asyncio.Semaphore(concurrency)
+    batch_start = time.perf_counter()
+    
+    print(f" Running {len(jobs)} research jobs, {concurrency} at a time")
+    
+    async def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        record = {key: job[key] for key in ("id", "line", "topic", "title") if key in job}
+        if "error" in job:
+            return {**record, "success": False, "error": job["error"], "elapsed": 0.0}
+        
+        async with limit:
+            started = time.perf_counter()
+            queued = started - batch_start
+            try:
+                result = await agent.research(job["topic"], fresh=fresh, title=job.get("title"))
+            except Exception as e:
+                result = {"success": False, "error": str(e), "topic": job["topic"]}
+            elapsed = time.perf_counter() - started
+        
+        return {**record, **result, "queued": round(queued, 3), "elapsed": round(elapsed, 3)}
+    
+    succeeded = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        for finished in asyncio.as_completed([run_job(job) for job in jobs]):
+            record = await finished
+            # Flush each result so finished jobs survive a crash mid-batch
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            
+            if record["success"]:
+                succeeded += 1
+                print(f" Finished line {record['line']} in {record['elapsed']:.1f}s: {record['topic']}")
+            else:
+                print(f" Failed line {record['line']}: {record.get('error')}")
+    
+    total = time.perf_counter() - batch_start
+    print(f" Batch complete: {succeeded}/{len(jobs)} succeeded in {total:.1f}s")
+    stats = format_rate_limit_stats()
+    if stats:
+        print(stats)
+    
+    return {"jobs": len(jobs), "succeeded": succeeded, "elapsed": total}
+
+def main():
+    parser = argparse.ArgumentParser(description="Research a batch of topics from a JSONL file.")
+    parser.add_argument("input", help="JSONL file with one {\"topic\": ..., \"title\": ...} object per line")
+    parser.add_argument("output", help="JSONL file to write results to as jobs finish")
+    parser.add_argument("--concurrency", type=int, default=Config.BATCH_MAX_CONCURRENCY,
+                        help="Maximum number of jobs running at once")
+    parser.add_argument("--fresh", action="store_true", help="Skip cached LLM responses")
+    args = parser.parse_args()
+    
+    asyncio.run(run_batch(args.input, args.output, args.concurrency, args.fresh))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
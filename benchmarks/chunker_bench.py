@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for the text chunker.
+
+Run from the repository root:
+    python -m benchmarks.chunker_bench
+"""
+
+import random
+import time
+from typing import List
+from tools.chunker import iter_chunks
+
+SIZES_KB = [64, 256, 1024, 4096]
+CHUNK_SIZES = [250, 500, 2000, 8000]
+VOCABULARY = ["quantum", "lattice", "key", "exchange", "protocol", "research",
+              "security", "algorithm", "industry", "standard", "migration", "risk"]
+
+def legacy_chunk_text(text: str, chunk_size: int = 500) -> List[str]:
+    """The previous WebScraper._chunk_text, kept for comparison."""
+    words = text.split()
+    chunks = []
+    current_chunk = []
+    
+    for word in words:
+        current_chunk.append(word)
+        if len(' '.join(current_chunk)) >= chunk_size:
+            chunks.append(' '.join(current_chunk))
+            current_chunk = []
+    
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+    
+    return chunks
+
+def make_document(size_kb: int) -> str:
+    """Build a synthetic document of roughly size_kb kilobytes."""
+    rng = random.Random(size_kb)
+    paragraphs = []
+    length = 0
+    while length < size_kb * 1024:
+        sentences = [
+            " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(6, 30))).capitalize() + "."
+            for _ in range(rng.randint(2, 8))
+        ]
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+def time_call(fn, *args, **kwargs) -> float:
+    """Best of three wall-clock timings in seconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    print(f"{'size':>8} {'legacy s':>10} {'word s':>10} {'sentence s':>11} {'sentence ms/MB':>15}")
+    for size_kb in SIZES_KB:
+        document = make_document(size_kb)
+        legacy = time_call(legacy_chunk_text, document)
+        word = time_call(lambda: list(iter_chunks(document, 500, boundary="word")))
+        sentence = time_call(lambda: list(iter_chunks(document, 500, boundary="sentence")))
+        per_mb = sentence / (len(document) / (1024 * 1024)) * 1000
+        print(f"{size_kb:>6}KB {legacy:>10.3f} {word:>10.3f} {sentence:>11.3f} {per_mb:>15.1f}")
+    
+    # The legacy chunker re-joins the current chunk after every word, so its
+    # cost also grows with the chunk size; the streaming chunker does not.
+    document = make_document(1024)
+    print()
+    print(f"{'chunk':>8} {'legacy s':>10} {'sentence s':>11}")
+    for chunk_size in CHUNK_SIZES:
+        legacy = time_call(legacy_chunk_text, document, chunk_size)
+        sentence = time_call(lambda: list(iter_chunks(document, chunk_size, boundary="sentence")))
+        print(f"{chunk_size:>8} {legacy:>10.3f} {sentence:>11.3f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+End-to-end benchmark of the research graph, fully offline.
+
+Runs AutoResearchAgent against a stub chat model with fixed latency and a
+local HTTP server serving fixture pages, and reports per-node and end-to-end
+latency, throughput at several concurrency levels and peak memory. Results
+are compared with a saved baseline and regressions beyond the thresholds
+make the command exit with status 1.
+
+Run from the repository root:
+    python -m benchmarks.graph_bench
+    python -m benchmarks.graph_bench --concurrency 1,4,16 --llm-latency 0.2
+    python -m benchmarks.graph_bench --token-latency 0.002 --refine-mode sections
+    python -m benchmarks.graph_bench --save-baseline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+from benchmarks.stubs import FixtureServer, StubChatModel, load_pages
+from config import Config
+from tools.llm import register_chat_model
+
+TOPIC = "The Impact of Quantum Computing on Cryptography"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "graph_bench.json")
+
+# Allowed relative change before a metric counts as a regression
+DEFAULT_THRESHOLDS = {"latency": 0.25, "throughput": 0.25, "memory": 0.3}
+
+# Latency changes smaller than this are noise, whatever the relative change
+MIN_LATENCY_CHANGE_MS = 5.0
+
+# Settings that must match for a baseline comparison to be meaningful
+COMPARED_SETTINGS = ("llm_latency", "token_latency", "fetch_latency", "pages", "page_kb",
+                     "pages_dir", "warm_caches", "concurrency", "refine_mode")
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def configure(args, workdir: str):
+    """Point every cache and output file at workdir, and enable or disable the caches."""
+    Config.TRACING_ENABLED = True
+    # Estimated token counts keep the benchmark offline and independent of tokenizer downloads
+    Config.TOKENIZER = "estimate"
+    Config.LLM_CACHE_ENABLED = args.warm_caches
+    Config.LLM_CACHE_PATH = os.path.join(workdir, "llm_responses.db")
+    Config.SEARCH_CACHE_ENABLED = args.warm_caches
+    Config.PAGE_CACHE_ENABLED = args.warm_caches
+    Config.PAGE_CACHE_DIR = os.path.join(workdir, "pages")
+    Config.CHECKPOINT_PATH = os.path.join(workdir, "checkpoints.db")
+    Config.METRICS_PATH = os.path.join(workdir, "metrics.prom")
+    Config.METRICS_PORT = None
+    Config.MAX_SEARCH_RESULTS = args.pages
+    Config.REFINE_MODE = args.refine_mode
+
+def install_stubs(model: StubChatModel, server: FixtureServer, workdir: str):
+    """Route chat models and searches to the stubs through their provider settings."""
+    register_chat_model("stub", lambda temperature: model)
+    Config.LLM_PROVIDER = "stub"
+    Config.SEARCH_PROVIDER = "fixture"
+    Config.SEARCH_HEDGE_PROVIDER = None
+    Config.SEARCH_FIXTURE_PATH = os.path.join(workdir, "search_results.json")
+    server.write_search_fixture(Config.SEARCH_FIXTURE_PATH)
+
+async def run_once(agent, quiet: bool) -> Dict[str, Any]:
+    """One research run; returns its wall time and per-node durations."""
+    output = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        started = time.perf_counter()
+        result = await agent.research(TOPIC)
+        elapsed = time.perf_counter() - started
+    
+    if not result["success"]:
+        raise RuntimeError(f"Benchmark run failed: {result['error']}")
+    
+    nodes: Dict[str, float] = {}
+    for span in result["trace"]["spans"]:
+        nodes[span["node"]] = nodes.get(span["node"], 0.0) + span["duration"]
+    return {"elapsed": elapsed, "nodes": nodes, "totals": result["trace"]["totals"]}
+
+async def run_concurrently(agent, count: int, quiet: bool) -> Dict[str, Any]:
+    """count runs at once on one agent; returns the batch wall time and each run's result."""
+    started = time.perf_counter()
+    # Runs print concurrently, so stdout is redirected once around the whole batch
+    output = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        runs = await asyncio.gather(*(run_once(agent, quiet=False) for _ in range(count)))
+    return {"wall": time.perf_counter() - started, "runs": runs}
+
+async def benchmark(args) -> Dict[str, Any]:
+    """Run every phase and return the metrics."""
+    from main import AutoResearchAgent
+    
+    agent = AutoResearchAgent()
+    quiet = not args.verbose
+    
+    # Warm-up runs start the extraction pool and fill caches; they are not measured
+    for _ in range(args.warmup):
+        await run_once(agent, quiet)
+    
+    runs = [await run_once(agent, quiet) for _ in range(args.runs)]
+    elapsed_ms = [run["elapsed"] * 1000 for run in runs]
+    node_names = list(runs[0]["nodes"])
+    
+    metrics: Dict[str, Any] = {
+        "e2e_p50_ms": round(percentile(elapsed_ms, 50), 2),
+        "e2e_p95_ms": round(percentile(elapsed_ms, 95), 2),
+        "node_p50_ms": {
+            node: round(percentile([run["nodes"].get(node, 0.0) * 1000 for run in runs], 50), 2)
+            for node in node_names
+        },
+        "node_p95_ms": {
+            node: round(percentile([run["nodes"].get(node, 0.0) * 1000 for run in runs], 95), 2)
+            for node in node_names
+        },
+        "llm_calls_per_run": runs[0]["totals"].get("llm_calls", 0),
+        "throughput_runs_per_min": {},
+        "concurrent_p50_ms": {}
+    }
+    
+    for count in args.concurrency:
+        batch = await run_concurrently(agent, count, quiet)
+        metrics["throughput_runs_per_min"][str(count)] = round(count / batch["wall"] * 60, 2)
+        metrics["concurrent_p50_ms"][str(count)] = round(
+            percentile([run["elapsed"] * 1000 for run in batch["runs"]], 50), 2
+        )
+    
+    if not args.no_memory:
+        # tracemalloc slows allocation-heavy code, so memory is measured in its own pass
+        tracemalloc.start()
+        try:
+            await run_concurrently(agent, max(args.concurrency), quiet)
+            metrics["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    metrics["max_rss_mb"] = round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+    
+    return metrics
+
+def print_report(metrics: Dict[str, Any]):
+    print(f"{'node':<12} {'p50 ms':>10} {'p95 ms':>10}")
+    for node, p50 in metrics["node_p50_ms"].items():
+        print(f"{node:<12} {p50:>10.1f} {metrics['node_p95_ms'][node]:>10.1f}")
+    print(f"{'end-to-end':<12} {metrics['e2e_p50_ms']:>10.1f} {metrics['e2e_p95_ms']:>10.1f}")
+    print(f"LLM calls per run: {metrics['llm_calls_per_run']:g}")
+    
+    print()
+    print(f"{'concurrent':>10} {'runs/min':>10} {'p50 ms':>10}")
+    for count, throughput in metrics["throughput_runs_per_min"].items():
+        print(f"{count:>10} {throughput:>10.1f} {metrics['concurrent_p50_ms'][count]:>10.1f}")
+    
+    print()
+    if "peak_memory_mb" in metrics:
+        print(f"Peak traced memory: {metrics['peak_memory_mb']:.1f} MB")
+    print(f"Max RSS: {metrics['max_rss_mb']:.1f} MB")
+
+def compare(metrics: Dict[str, Any], baseline: Dict[str, Any], thresholds: Dict[str, float]) -> List[str]:
+    """Regressions of metrics against baseline metrics, as printable lines."""
+    old = baseline["metrics"]
+    checks = [
+        ("e2e_p50_ms", old.get("e2e_p50_ms"), metrics["e2e_p50_ms"], "latency"),
+        ("e2e_p95_ms", old.get("e2e_p95_ms"), metrics["e2e_p95_ms"], "latency")
+    ]
+    for node, value in metrics["node_p50_ms"].items():
+        checks.append((f"node_p50_ms[{node}]", old.get("node_p50_ms", {}).get(node), value, "latency"))
+    for count, value in metrics["throughput_runs_per_min"].items():
+        checks.append((f"throughput_runs_per_min[{count}]", old.get("throughput_runs_per_min", {}).get(count), value, "throughput"))
+    if "peak_memory_mb" in metrics:
+        checks.append(("peak_memory_mb", old.get("peak_memory_mb"), metrics["peak_memory_mb"], "memory"))
+    
+    regressions = []
+    for name, before, after, kind in checks:
+        if not before:
+            continue
+        if kind == "throughput":
+            change = (before - after) / before
+        else:
+            change = (after - before) / before
+            if kind == "latency" and after - before < MIN_LATENCY_CHANGE_MS:
+                continue
+        if change > thresholds[kind]:
+            regressions.append(f"{name}: {before:g} -> {after:g} ({change:+.0%} worse, limit {thresholds[kind]:.0%})")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the research graph.")
+    parser.add_argument("--runs", type=int, default=5, help="sequential runs measured for latency")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs before measuring")
+    parser.add_argument("--concurrency", default="1,4,8",
+                        help="comma-separated numbers of concurrent runs for throughput")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="stub seconds per LLM call")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="stub seconds per completion token")
+    parser.add_argument("--fetch-latency", type=float, default=0.01, help="fixture server seconds per page")
+    parser.add_argument("--pages", type=int, default=5, help="synthetic fixture pages (search results per run)")
+    parser.add_argument("--page-kb", type=int, default=32, help="size of each synthetic page")
+    parser.add_argument("--pages-dir", help="serve recorded *.html pages from this directory instead")
+    parser.add_argument("--warm-caches", action="store_true", help="keep the LLM, search and page caches on")
+    parser.add_argument("--refine-mode", choices=["article", "sections"], default="article",
+                        help="refine the whole article at once or section by section")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float,
+                        help="override every regression threshold (e.g. 0.1 for 10%%)")
+    parser.add_argument("--verbose", action="store_true", help="show the agent's own output")
+    args = parser.parse_args(argv)
+    args.concurrency = [int(n) for n in args.concurrency.split(",") if n.strip()]
+    return args
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    settings = {name: getattr(args, name) for name in COMPARED_SETTINGS}
+    
+    pages = load_pages(args.pages_dir, args.pages, args.page_kb)
+    args.pages = len(pages)
+    settings["pages"] = args.pages
+    
+    with tempfile.TemporaryDirectory() as workdir, FixtureServer(pages, args.fetch_latency) as server:
+        configure(args, workdir)
+        install_stubs(StubChatModel(latency=args.llm_latency, token_latency=args.token_latency), server, workdir)
+        metrics = asyncio.run(benchmark(args))
+    
+    print_report(metrics)
+    
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "thresholds": DEFAULT_THRESHOLDS, "metrics": metrics}, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    
+    if baseline.get("settings") != settings:
+        print(f"\nBaseline was recorded with different settings ({baseline.get('settings')}); not comparing")
+        return 0
+    
+    thresholds = dict(DEFAULT_THRESHOLDS, **baseline.get("thresholds", {}))
+    if args.tolerance is not None:
+        thresholds = {kind: args.tolerance for kind in thresholds}
+    
+    regressions = compare(metrics, baseline, thresholds)
+    print()
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    
+    print("No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Offline stand-ins for the network services a research run depends on:
+a deterministic chat model and a local HTTP server for fixture pages.
+"""
+
+import asyncio
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from benchmarks.chunker_bench import make_document
+from tools.tokens import count_tokens
+
+OUTLINE_SECTIONS = ["Introduction", "Technical Fundamentals", "Current Applications",
+                    "Security Concerns", "Economic Impact", "Future Implications", "Conclusion"]
+
+class StubChatModel(BaseChatModel):
+    """Chat model answering each node's prompt with a canned, well-formed response.
+    
+    Every call sleeps for latency seconds plus token_latency per completion
+    token, so runs take a realistic, repeatable amount of time.
+    """
+    
+    latency: float = 0.05
+    token_latency: float = 0.0
+    article_words: int = 300
+    
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+    
+    def _respond(self, messages) -> str:
+        system, prompt = messages[0].content, messages[-1].content
+        
+        if "research assistant" in system:
+            perspective = re.search(r"perspective of: (\w+)", prompt).group(1)
+            urls = re.findall(r"URL: (\S+)", prompt) or ["https://example.com"]
+            return json.dumps([
+                {
+                    "fact": f"Finding {i} on {perspective.replace('_', ' ')} reported by source {i % len(urls)}",
+                    "perspective": perspective,
+                    "source_url": urls[i % len(urls)],
+                    "confidence": 0.8,
+                    "tags": [perspective]
+                }
+                for i in range(4)
+            ])
+        
+        if "outline" in system:
+            title = re.search(r"Use this exact title: (.+)", prompt)
+            return json.dumps({
+                "title": title.group(1).strip() if title else "Benchmark Article",
+                "sections": [{"title": section, "subsections": []} for section in OUTLINE_SECTIONS],
+                "summary": "An article generated for benchmarking."
+            })
+        
+        # Drafts and refinement return prose; synthesis returns it under the outline's headings
+        rng = random.Random(prompt)
+        words = prompt.split() or ["research"]
+        if "level 1 heading" not in prompt:
+            # A refined section is about as long as the section it was given
+            section = re.search(r"SECTION TEXT:(.*?)Provide only", prompt, re.DOTALL)
+            count = len(section.group(1).split()) if section else self.article_words
+            return " ".join(rng.choice(words) for _ in range(count))
+        
+        title = re.search(r"level 1 heading: # (.+)", prompt).group(1).strip()
+        section_words = max(1, self.article_words // len(OUTLINE_SECTIONS))
+        sections = [
+            f"## {section}\n\n" + " ".join(rng.choice(words) for _ in range(section_words))
+            for section in OUTLINE_SECTIONS
+        ]
+        return f"# {title}\n\n" + "\n\n".join(sections)
+    
+    def _result(self, content: str, messages) -> ChatResult:
+        prompt_tokens = sum(count_tokens(str(message.content)) for message in messages)
+        completion_tokens = count_tokens(content)
+        message = AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+    
+    def _delay(self, content: str) -> float:
+        return self.latency + self.token_latency * count_tokens(content)
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content = self._respond(messages)
+        time.sleep(self._delay(content))
+        return self._result(content, messages)
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content = self._respond(messages)
+        await asyncio.sleep(self._delay(content))
+        return self._result(content, messages)
+
+def make_page(index: int, size_kb: int) -> bytes:
+    """A synthetic article page of roughly size_kb kilobytes."""
+    paragraphs = make_document(size_kb + index).split("\n\n")
+    body = "\n".join(f"<p>{html.escape(paragraph)}</p>" for paragraph in paragraphs)
+    return (
+        f"<html lang=\"en\"><head><title>Fixture page {index}</title>"
+        f"<meta name=\"description\" content=\"Benchmark fixture {index}\"></head>"
+        f"<body><nav>Home | About</nav><article><h1>Fixture page {index}</h1>\n{body}\n</article>"
+        f"<footer>Footer</footer></body></html>"
+    ).encode("utf-8")
+
+def load_pages(pages_dir: Optional[str] = None, count: int = 5, size_kb: int = 32) -> Dict[str, bytes]:
+    """Recorded pages (*.html) from pages_dir, or count synthetic pages."""
+    if not pages_dir:
+        return {f"/page{i}.html": make_page(i, size_kb) for i in range(count)}
+    
+    pages = {}
+    for name in sorted(os.listdir(pages_dir)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(pages_dir, name), "rb") as f:
+                pages[f"/{name}"] = f.read()
+    if not pages:
+        raise ValueError(f"No .html pages found in {pages_dir}")
+    return pages
+
+class FixtureServer:
+    """Local HTTP server serving fixture pages from memory, optionally with added latency."""
+    
+    def __init__(self, pages: Dict[str, bytes], latency: float = 0.0):
+        self.pages = pages
+        self.latency = latency
+        
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                body = server.pages.get(self.path.split("?")[0])
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    def __enter__(self) -> "FixtureServer":
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def write_search_fixture(self, path: str):
+        """Write a fixture for the "fixture" search provider whose results are the pages, in a stable order."""
+        results = [
+            {
+                "url": f"{self.base_url}{page}",
+                "title": f"Fixture {page.strip('/')}",
+                "content": f"Fixture page {page.strip('/')}",
+                "relevance_score": round(1.0 - i * 0.05, 2)
+            }
+            for i, page in enumerate(sorted(self.pages))
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"default": results}, f)
\ No newline at end of file
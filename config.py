@@ -5,10 +5,73 @@ load_dotenv()
 
 class Config:
     """Configuration settings for the AutoResearch agent."""
+    # Chat model factory registered in tools.llm ("openai", or e.g. the benchmark's "stub")
+    LLM_PROVIDER = "openai"
     LLM_MODEL = "gpt-4o"
     
+    # Chat completion cache shared by all nodes (memory LRU + SQLite)
+    LLM_CACHE_ENABLED = True
+    LLM_CACHE_PATH = os.path.join(".cache", "llm_responses.db")
+    LLM_CACHE_TTL = 7 * 24 * 60 * 60
+    LLM_CACHE_MAX_ENTRIES = 5000
+    LLM_CACHE_MEMORY_ENTRIES = 256
+    
+    # Providers: "tavily", "serpapi", or "fixture" (canned results from SEARCH_FIXTURE_PATH)
     SEARCH_PROVIDER = "tavily"  
+    SEARCH_FIXTURE_PATH = None
     MAX_SEARCH_RESULTS = 5
+    SEARCH_QUERY_SUFFIX = "recent developments 2024 research"
+    
+    # "single" issues one query; "perspectives" adds one query per research perspective,
+    # run concurrently and merged by reciprocal rank fusion into SEARCH_FUSED_RESULTS results
+    SEARCH_QUERY_MODE = "single"
+    SEARCH_FUSED_RESULTS = 8
+    SEARCH_RRF_K = 60
+    
+    # Hedged search: when SEARCH_PROVIDER has not answered within its recent
+    # SEARCH_HEDGE_PERCENTILE latency, SEARCH_HEDGE_PROVIDER is asked too and the first
+    # answer wins; until SEARCH_HEDGE_MIN_SAMPLES latencies are known it waits the default delay
+    SEARCH_HEDGE_PROVIDER = None
+    SEARCH_HEDGE_PERCENTILE = 95
+    SEARCH_HEDGE_MIN_SAMPLES = 20
+    SEARCH_HEDGE_MIN_DELAY = 0.25
+    SEARCH_HEDGE_DEFAULT_DELAY = 2.0
+    SEARCH_HEDGE_WORKERS = 16
+    
+    # In-process search cache; stale entries are served while a refresh runs
+    SEARCH_CACHE_ENABLED = True
+    SEARCH_CACHE_TTL = 60 * 60
+    SEARCH_CACHE_STALE_TTL = 24 * 60 * 60
+    SEARCH_CACHE_MAX_ENTRIES = 1024
+    
+    # Retrieval: fetch all search results concurrently over a pooled client
+    ASYNC_RETRIEVAL = True
+    RETRIEVAL_MAX_CONCURRENCY = 10
+    RETRIEVAL_PER_HOST_CONCURRENCY = 2
+    RETRIEVAL_TIMEOUT = 10
+    
+    # On-disk page cache shared by every run
+    PAGE_CACHE_ENABLED = True
+    PAGE_CACHE_DIR = os.path.join(".cache", "pages")
+    PAGE_CACHE_TTL = 24 * 60 * 60
+    PAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+    
+    # Mirrored or syndicated copies of a page are dropped before research: bottom-k MinHash over
+    # word shingles, with an estimated Jaccard similarity of at least SOURCE_DUPLICATE_THRESHOLD
+    SOURCE_DEDUPE_ENABLED = True
+    SOURCE_DUPLICATE_THRESHOLD = 0.8
+    SOURCE_SHINGLE_SIZE = 5
+    SOURCE_SIGNATURE_SIZE = 128
+    
+    # Chunking of extracted page text; sizes are in CHUNK_UNIT ("chars" or "tokens")
+    CHUNK_SIZE = 500
+    CHUNK_OVERLAP = 0
+    CHUNK_UNIT = "chars"
+    CHUNK_BOUNDARY = "sentence"
+    
+    # HTML extraction runs in a process pool (0 workers extracts on a thread)
+    EXTRACTION_WORKERS = 2
+    EXTRACTION_TIMEOUT = 20
     
     RESEARCH_PERSPECTIVES = [
         "technical_fundamentals",
@@ -20,8 +83,89 @@ class Config:
         "security_concerns"
     ]
     
+    # Search terms used to rank source chunks for each perspective
+    PERSPECTIVE_KEYWORDS = {
+        "technical_fundamentals": "how it works mechanism architecture principle method algorithm design",
+        "historical_context": "history origin early developed first decade timeline evolution",
+        "current_applications": "used application deployed industry product today adoption example",
+        "future_implications": "future expected predict trend next upcoming potential roadmap",
+        "ethical_considerations": "ethics ethical privacy fairness bias rights responsibility harm",
+        "economic_impact": "cost market economic investment revenue billion growth jobs",
+        "security_concerns": "security risk attack threat vulnerability protect breach safety"
+    }
+    
+    # Chunks sent per perspective: the top-k by relevance within the research token budget
+    RESEARCH_TOP_K_CHUNKS = 12
+    
+    # Perspectives are analyzed concurrently; a slow one is cut off by the timeout
+    RESEARCH_MAX_CONCURRENCY = 7
+    RESEARCH_PERSPECTIVE_TIMEOUT = 120
+    
+    # Near-duplicate facts from the same source are merged across perspectives: SimHash
+    # fingerprints at most FACT_SIMHASH_DISTANCE of 64 bits apart, sharing FACT_MIN_OVERLAP of terms
+    FACT_CONSOLIDATION_ENABLED = True
+    FACT_SIMHASH_DISTANCE = 6
+    FACT_MIN_OVERLAP = 0.5
+    
+    # Outline sections drafted at the same time (1 drafts sequentially)
+    DRAFT_MAX_CONCURRENCY = 4
+    
+    # Fact routing: facts per section, and how many sections may reuse a fact (0 = no limit)
+    DRAFT_FACTS_PER_SECTION = 10
+    DRAFT_MAX_SECTIONS_PER_FACT = 2
+    DRAFT_DEDUPE_FACTS = True
+    
     MAX_ARTICLE_LENGTH = 2000
     MIN_SOURCES = 3
+    
+    # "article" refines the whole article in one call; "sections" splits it at headings of up to
+    # REFINE_SPLIT_LEVEL and refines sections concurrently, skipping those that pass a local
+    # quality check (REFINE_MAX_SENTENCE_WORDS caps sentence length)
+    REFINE_MODE = "article"
+    REFINE_SPLIT_LEVEL = 2
+    REFINE_MAX_CONCURRENCY = 4
+    REFINE_MAX_SENTENCE_WORDS = 40
+    
+    # Token counting: "tiktoken" (encodings cached in TOKENIZER_CACHE_DIR after the first
+    # download) or "estimate" (~4 characters per token, no network)
+    TOKENIZER = "tiktoken"
+    TOKENIZER_CACHE_DIR = os.path.join(".cache", "tiktoken")
+    
+    # Prompt token budget per node; lower-priority context is trimmed to fit
+    TOKEN_BUDGETS = {
+        "research": 4000,
+        "outline": 3000,
+        "draft": 2000,
+        "synthesis": 8000,
+        "refinement": 8000
+    }
+    
+    # Batch mode: research jobs running at once across the whole batch
+    BATCH_MAX_CONCURRENCY = 4
+    
+    # Per-node checkpoints so failed runs can resume; "async" writes overlap the next node
+    CHECKPOINT_ENABLED = True
+    CHECKPOINT_PATH = os.path.join(".cache", "checkpoints.db")
+    CHECKPOINT_DURABILITY = "async"
+    # Completed runs kept (final checkpoint only) for refresh(); older ones are deleted
+    CHECKPOINT_KEEP_COMPLETED = 50
+    
+    # Client-side rate limits per provider; concurrency adapts between min and max
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMITS = {
+        "openai": {"rpm": 500, "tpm": 30000, "max_concurrency": 16},
+        "tavily": {"rpm": 100, "max_concurrency": 4},
+        "serpapi": {"rpm": 100, "max_concurrency": 4}
+    }
+    RATE_LIMIT_MAX_RETRIES = 5
+    # Completion tokens charged to the TPM bucket when a request sets no max_tokens
+    RATE_LIMIT_COMPLETION_TOKENS = 1000
+    
+    # Per-run traces (attached to results) and Prometheus metrics; METRICS_PORT serves /metrics
+    TRACING_ENABLED = True
+    METRICS_PATH = os.path.join(".cache", "metrics.prom")
+    METRICS_PORT = None
 
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
\ No newline at end of file
+    TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+    SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
\ No newline at end of file
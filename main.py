@@ -7,13 +7,47 @@ from nodes.outline_node import OutlineNode
 from nodes.draft_node import DraftNode
 from nodes.synthesis_node import SynthesisNode
 from nodes.refinement_node import RefinementNode
+from tools.llm_cache import bypass_llm_cache
+from tools.rate_limiter import format_rate_limit_stats
+from tools.tokens import load_tokenizer
+from tools.incremental import previous_run
+from tools.tracing import (
+    RunTrace, TraceCallbackHandler, active_trace, export_trace, format_trace,
+    start_metrics_server, start_trace, traced_node
+)
+from config import Config
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 import asyncio
+import os
+import uuid
+
+try:
+    import aiosqlite
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+except ImportError:
+    AsyncSqliteSaver = None
+
+# Schema types stored in checkpointed state, allowed back in when a run resumes
+CHECKPOINT_TYPES = [
+    ("models.schemas", name)
+    for name in ("SearchResult", "SourceContent", "ResearchFact", "ArticleOutline", "SectionDraft")
+]
 
 class AutoResearchAgent:
     """Main agent class for automated research and article generation."""
     
+    # Nodes whose LLM output is the article itself and is streamed to callers
+    STREAMED_NODES = ("synthesize", "refine")
+    
     def __init__(self):
-        self.graph = self._build_graph()
+        # Loading the tokenizer may download its encoding; do it here rather than inside a node
+        load_tokenizer()
+        self.workflow = self._build_graph()
+        self.graph = self.workflow.compile()
+        if Config.TRACING_ENABLED and Config.METRICS_PORT:
+            start_metrics_server(Config.METRICS_PORT)
     
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph workflow."""
@@ -21,14 +55,18 @@ class AutoResearchAgent:
         # Create graph
         workflow = StateGraph(ResearchState)
         
-        # Add nodes
-        workflow.add_node("search", SearchNode())
-        workflow.add_node("retrieve", RetrieveNode())
-        workflow.add_node("research", ResearchNode())
-        workflow.add_node("outline", OutlineNode())
-        workflow.add_node("draft", DraftNode())
-        workflow.add_node("synthesize", SynthesisNode())
-        workflow.add_node("refine", RefinementNode())
+        # Add nodes, each traced under its name
+        nodes = {
+            "search": SearchNode(),
+            "retrieve": RetrieveNode(),
+            "research": ResearchNode(),
+            "outline": OutlineNode(),
+            "draft": DraftNode(),
+            "synthesize": SynthesisNode(),
+            "refine": RefinementNode()
+        }
+        for name, node in nodes.items():
+            workflow.add_node(name, traced_node(name, node))
         
         # Define edges
         workflow.set_entry_point("search")
@@ -40,55 +78,299 @@ class AutoResearchAgent:
         workflow.add_edge("synthesize", "refine")
         workflow.add_edge("refine", END)
         
-        return workflow.compile()
+        return workflow
+    
+    def _checkpointing_enabled(self) -> bool:
+        return Config.CHECKPOINT_ENABLED and AsyncSqliteSaver is not None
+    
+    @asynccontextmanager
+    async def _open_graph(self):
+        """Yield the graph for one run, checkpointed to SQLite when enabled.
+        
+        Each run opens its own saver: a connection and a compile cost a few
+        milliseconds, and the saver is never shared across event loops.
+        """
+        if not self._checkpointing_enabled():
+            yield self.graph
+            return
+        
+        os.makedirs(os.path.dirname(Config.CHECKPOINT_PATH) or ".", exist_ok=True)
+        async with aiosqlite.connect(Config.CHECKPOINT_PATH) as conn:
+            checkpointer = AsyncSqliteSaver(
+                conn,
+                serde=JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_TYPES)
+            )
+            yield self.workflow.compile(checkpointer=checkpointer)
     
-    async def research(self, topic: str) -> dict:
-        """Execute research workflow for a given topic."""
-        print(f" Starting research on: {topic}")
+    def _run_config(self, run_id: str, trace: Optional[RunTrace] = None) -> dict:
+        config = {"configurable": {"thread_id": run_id}}
+        if trace is not None:
+            config["callbacks"] = [TraceCallbackHandler(trace)]
+        return config
+    
+    async def research(self, topic: str, fresh: bool = False, title: Optional[str] = None,
+                       run_id: Optional[str] = None) -> dict:
+        """Execute research workflow for a given topic.
+        
+        Set fresh=True to skip cached LLM responses for this run, and title to
+        use a custom article title. Every node is checkpointed under run_id (a
+        new one by default), so a failed run can be picked up with resume().
+        """
+        run_id = run_id or uuid.uuid4().hex
+        print(f" Starting research on: {topic} (run {run_id})")
+        
+        return await self._run(self._initial_state(topic, title), topic, run_id, fresh)
+    
+    async def resume(self, run_id: str, fresh: bool = False) -> dict:
+        """Resume a failed or interrupted run at the node after its last checkpoint."""
+        if not self._checkpointing_enabled():
+            return {"success": False, "error": "Checkpointing is disabled", "run_id": run_id}
+        
+        async with self._open_graph() as graph:
+            snapshot = await graph.aget_state(self._run_config(run_id))
+        if not snapshot.values:
+            return {"success": False, "error": f"No checkpoint found for run {run_id}", "run_id": run_id}
+        
+        topic = snapshot.values["topic"]
+        if not snapshot.next:
+            print(f" Run {run_id} already completed")
+            return self._build_result(topic, snapshot.values, run_id)
+        
+        print(f" Resuming research on: {topic} (run {run_id}) at {', '.join(snapshot.next)}")
+        
+        # No input: the graph continues from the saved state
+        return await self._run(None, topic, run_id, fresh)
+    
+    async def refresh(self, run_id: str, fresh: bool = False, new_run_id: Optional[str] = None) -> dict:
+        """Re-research a completed run's topic incrementally.
+        
+        Search and retrieval run again; facts are only extracted from new or
+        changed sources, the outline is kept, and only sections whose supporting
+        facts changed are re-drafted. The refresh is a new run (new_run_id).
+        """
+        if not self._checkpointing_enabled():
+            return {"success": False, "error": "Checkpointing is disabled", "run_id": run_id}
+        
+        async with self._open_graph() as graph:
+            snapshot = await graph.aget_state(self._run_config(run_id))
+        if not snapshot.values:
+            return {"success": False, "error": f"No checkpoint found for run {run_id}", "run_id": run_id}
+        if snapshot.next:
+            return {"success": False, "error": f"Run {run_id} has not completed; resume it first", "run_id": run_id}
+        
+        topic = snapshot.values["topic"]
+        new_run_id = new_run_id or uuid.uuid4().hex
+        print(f" Refreshing research on: {topic} (run {new_run_id}, from run {run_id})")
+        
+        initial_state = self._initial_state(topic, snapshot.values.get("title"))
+        initial_state["previous"] = previous_run(run_id, snapshot.values)
+        
+        return await self._run(initial_state, topic, new_run_id, fresh)
+    
+    async def _run(self, graph_input: Optional[ResearchState], topic: str, run_id: str, fresh: bool) -> dict:
+        """Run the graph to completion for a new or resumed run."""
         print("=" * 50)
+        trace = start_trace(run_id)
         
         try:
-            # Initialize state
-            initial_state = ResearchState(
-                topic=topic,
-                search_results=[],
-                source_contents=[],
-                research_memory={},
-                outline=None,
-                draft_sections={},
-                final_article="",
-                error=None,
-                retry_count=0
-            )
-            
             # Execute graph
-            final_state = await self.graph.ainvoke(initial_state)
+            async with self._open_graph() as graph:
+                with bypass_llm_cache(fresh), active_trace(trace):
+                    final_state = await graph.ainvoke(
+                        graph_input,
+                        self._run_config(run_id, trace),
+                        durability=Config.CHECKPOINT_DURABILITY
+                    )
+                await self._prune_checkpoints(graph, run_id)
             
             print("=" * 50)
             print(" Research completed successfully!")
+            self._report_rate_limits()
+            
+            result = self._build_result(topic, final_state, run_id)
             
-            return {
-                "success": True,
+        except Exception as e:
+            print(f" Research failed: {e}")
+            if self._checkpointing_enabled():
+                print(f" Resume with: resume({run_id!r})")
+            result = {
+                "success": False,
+                "error": str(e),
                 "topic": topic,
-                "final_article": final_state["final_article"],
-                "sources_used": len(final_state.get("source_contents", [])),
-                "research_facts": sum(len(facts) for facts in final_state.get("research_memory", {}).values())
+                "run_id": run_id
             }
+        
+        return self._finish_trace(trace, result)
+    
+    async def _prune_checkpoints(self, graph, run_id: str):
+        """Keep only the final checkpoint of a completed run, and only for recent runs.
+        
+        refresh() needs a completed run's final state, so the run's thread is
+        replaced by that one checkpoint; completed runs beyond
+        CHECKPOINT_KEEP_COMPLETED are deleted outright.
+        """
+        checkpointer = graph.checkpointer
+        if checkpointer is None:
+            return
+        
+        try:
+            latest = await checkpointer.aget_tuple(self._run_config(run_id))
+            await checkpointer.adelete_thread(run_id)
+            if latest is None or Config.CHECKPOINT_KEEP_COMPLETED <= 0:
+                return
+            
+            # Tagged so older completed runs can be found without touching failed ones
+            metadata = {**latest.metadata, "completed": True}
+            config = {"configurable": {"thread_id": run_id, "checkpoint_ns": ""}}
+            await checkpointer.aput(config, latest.checkpoint, metadata, latest.checkpoint["channel_versions"])
+            
+            # Newest first; the listing holds the saver's lock, so delete once it is done
+            completed = [
+                item.config["configurable"]["thread_id"]
+                async for item in checkpointer.alist(None, filter={"completed": True})
+            ]
+            for thread_id in completed[Config.CHECKPOINT_KEEP_COMPLETED:]:
+                await checkpointer.adelete_thread(thread_id)
+        except Exception as e:
+            print(f"Error pruning checkpoints for run {run_id}: {e}")
+    
+    async def research_stream(self, topic: str, fresh: bool = False, title: Optional[str] = None,
+                              run_id: Optional[str] = None) -> AsyncIterator[dict]:
+        """Execute research workflow, yielding events as the graph runs.
+        
+        Events are dicts with a "type" of:
+        - "node_start" / "node_end": a graph node began or finished ("node", "error")
+        - "token": article text generated by a streamed node ("node", "content");
+          section refinement interleaves its sections, so it streams no tokens
+        - "result": the final result, in the same shape research() returns ("result")
+        """
+        run_id = run_id or uuid.uuid4().hex
+        print(f" Starting research on: {topic} (run {run_id})")
+        print("=" * 50)
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        trace = start_trace(run_id)
+        streamed = [
+            node for node in self.STREAMED_NODES
+            if not (node == "refine" and Config.REFINE_MODE == "sections")
+        ]
+        
+        async def run_graph():
+            try:
+                async with self._open_graph() as graph:
+                    with bypass_llm_cache(fresh), active_trace(trace):
+                        async for item in graph.astream(
+                            self._initial_state(topic, title),
+                            self._run_config(run_id, trace),
+                            stream_mode=["messages", "debug", "values"],
+                            durability=Config.CHECKPOINT_DURABILITY
+                        ):
+                            await queue.put(item)
+                    await self._prune_checkpoints(graph, run_id)
+            finally:
+                await queue.put((finished, None))
+        
+        # The graph runs in its own task so the cache bypass never leaks into the caller
+        task = asyncio.create_task(run_graph())
+        final_state = None
+        
+        try:
+            while True:
+                mode, chunk = await queue.get()
+                if mode is finished:
+                    break
+                
+                if mode == "messages":
+                    message, metadata = chunk
+                    node = metadata.get("langgraph_node")
+                    if node in streamed and message.content:
+                        yield {"type": "token", "node": node, "content": message.content}
+                elif mode == "debug":
+                    payload = chunk["payload"]
+                    if chunk["type"] == "task":
+                        yield {"type": "node_start", "node": payload["name"]}
+                    elif chunk["type"] == "task_result":
+                        yield {"type": "node_end", "node": payload["name"], "error": payload.get("error")}
+                else:
+                    final_state = chunk
+            
+            await task
+            
+            print("=" * 50)
+            print(" Research completed successfully!")
+            self._report_rate_limits()
+            
+            result = self._build_result(topic, final_state, run_id)
             
         except Exception as e:
             print(f" Research failed: {e}")
-            return {
+            result = {
                 "success": False,
                 "error": str(e),
-                "topic": topic
+                "topic": topic,
+                "run_id": run_id
             }
+        finally:
+            task.cancel()
+        
+        yield {"type": "result", "result": self._finish_trace(trace, result)}
+    
+    def _finish_trace(self, trace: Optional[RunTrace], result: dict) -> dict:
+        """Attach the run's trace to its result and export it to the process metrics."""
+        if trace is None:
+            return result
+        
+        trace.finish(result.get("error"))
+        export_trace(trace)
+        print(format_trace(trace))
+        result["trace"] = trace.to_dict()
+        return result
+    
+    def _report_rate_limits(self):
+        """Print the current client-side rate limits, for tuning throughput."""
+        stats = format_rate_limit_stats()
+        if stats:
+            print(stats)
+    
+    def _initial_state(self, topic: str, title: Optional[str] = None) -> ResearchState:
+        """Initialize state for a new run."""
+        return ResearchState(
+            topic=topic,
+            title=title,
+            previous=None,
+            search_results=[],
+            source_contents=[],
+            changed_sources=None,
+            research_memory={},
+            outline=None,
+            draft_sections={},
+            section_facts={},
+            final_article="",
+            error=None,
+            retry_count=0
+        )
+    
+    def _build_result(self, topic: str, final_state: dict, run_id: str) -> dict:
+        """Summarize a finished run."""
+        result = {
+            "success": True,
+            "topic": topic,
+            "run_id": run_id,
+            "final_article": final_state["final_article"],
+            "sources_used": len(final_state.get("source_contents", [])),
+            "research_facts": sum(len(facts) for facts in final_state.get("research_memory", {}).values())
+        }
+        if final_state.get("outline"):
+            result["title"] = final_state["outline"].title
+        return result
 
 # Example usage
 async def main():
     """Example usage of the AutoResearch agent."""
     
-    # Initialize agent
-    agent = AutoResearchAgent()
+    # Initialize agent; built in a thread since it may download the tokenizer
+    agent = await asyncio.to_thread(AutoResearchAgent)
     
     # Example topics
     topics = [
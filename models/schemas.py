@@ -23,6 +23,8 @@ class ResearchFact(BaseModel):
     source_url: str
     confidence: float = Field(ge=0, le=1)
     tags: List[str] = []
+    # Every perspective that extracted this fact, once near-duplicates are merged
+    perspectives: List[str] = []
 
 class ArticleOutline(BaseModel):
     """Schema for article outline."""
@@ -1,63 +1,117 @@
+import asyncio
 from typing import List, Dict
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 from state import ResearchState
 from models.schemas import SectionDraft
+from tools.llm import chat_model
+from tools.fact_index import FactIndex
+from tools.incremental import fact_key
+from tools.token_budget import TokenBudget, count_message_tokens
 from config import Config
 
 class DraftNode:
     """Node for drafting article sections."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(model=Config.LLM_MODEL, temperature=0.3)
+        self.llm = chat_model(temperature=0.3)
+        self.budget = TokenBudget("draft")
     
-    def __call__(self, state: ResearchState) -> Command[ResearchState]:
+    async def __call__(self, state: ResearchState) -> Command[ResearchState]:
         """Draft all article sections."""
         outline = state["outline"]
         research_memory = state["research_memory"]
         
         if not outline:
-            return Command(update={"draft_sections": {}})
+            return Command(update={"draft_sections": {}, "section_facts": {}})
         
         print(f"✍️ Drafting {len(outline.sections)} sections...")
         
-        draft_sections = {}
+        # Score every fact against every section once, up front
+        fact_index = FactIndex(research_memory, dedupe=Config.DRAFT_DEDUPE_FACTS)
+        section_facts = fact_index.route(
+            outline.sections,
+            top_k=Config.DRAFT_FACTS_PER_SECTION,
+            max_sections_per_fact=Config.DRAFT_MAX_SECTIONS_PER_FACT
+        )
+        fact_keys = {
+            section["title"]: [fact_key(fact) for fact in facts]
+            for section, facts in zip(outline.sections, section_facts)
+        }
+        
+        # On a refresh, sections whose supporting facts are unchanged keep their previous draft
+        previous = state.get("previous") or {}
+        reusable = {
+            title: previous["draft_sections"][title]
+            for title, keys in fact_keys.items()
+            if previous.get("section_facts", {}).get(title) == keys and title in previous.get("draft_sections", {})
+        }
+        if previous:
+            print(f" Reusing {len(reusable)}/{len(outline.sections)} section drafts from run {previous['run_id']}")
         
-        for i, section in enumerate(outline.sections):
+        limit = asyncio.Semaphore(Config.DRAFT_MAX_CONCURRENCY)
+        
+        async def draft(i: int, section: dict) -> SectionDraft:
             section_title = section["title"]
-            print(f" Drafting: {section_title}")
-            
-            relevant_facts = self._get_relevant_facts(section_title, research_memory)
+            if section_title in reusable:
+                return reusable[section_title]
             
-            section_draft = self._draft_section(
-                section_title, 
-                relevant_facts, 
-                i, 
-                len(outline.sections)
-            )
-            
-            draft_sections[section_title] = section_draft
+            async with limit:
+                print(f" Drafting: {section_title}")
+                
+                return await self._draft_section(
+                    section_title, 
+                    section_facts[i], 
+                    i, 
+                    len(outline.sections)
+                )
         
-        print(" All sections drafted")
+        drafts = await asyncio.gather(*(draft(i, section) for i, section in enumerate(outline.sections)))
         
-        return Command(update={"draft_sections": draft_sections})
-    
-    def _get_relevant_facts(self, section_title: str, research_memory: dict) -> list:
-        """Get facts relevant to the section."""
-        relevant_facts = []
+        # Reassemble in outline order regardless of completion order
+        draft_sections = {}
+        for section, section_draft in zip(outline.sections, drafts):
+            draft_sections[section["title"]] = section_draft
         
-        for perspective, facts in research_memory.items():
-            for fact in facts:
-                if any(keyword in section_title.lower() for keyword in perspective.split('_')):
-                    relevant_facts.append(fact)
+        print(" All sections drafted")
         
-        return relevant_facts[:10] 
+        return Command(update={"draft_sections": draft_sections, "section_facts": fact_keys})
     
-    def _draft_section(self, section_title: str, facts: list, section_index: int, total_sections: int) -> SectionDraft:
+    async def _draft_section(self, section_title: str, facts: list, section_index: int, total_sections: int) -> SectionDraft:
         """Draft a single section."""
-        facts_text = "\n".join([f"- {fact.fact} (Source: {fact.source_url})" for fact in facts])
+        # Facts arrive best-first, so trimming to the budget drops the weakest matches
+        fixed_tokens = count_message_tokens(self._build_messages(section_title, "", section_index, total_sections))
+        fact_lines = [f"- {fact.fact} (Source: {fact.source_url})" for fact in facts]
+        kept = self.budget.fit(fact_lines, fixed_tokens)
+        facts = [facts[i] for i in kept]
+        facts_text = "\n".join(fact_lines[i] for i in kept)
+        
+        messages = self._build_messages(section_title, facts_text, section_index, total_sections)
         
+        try:
+            response = await self.llm.ainvoke(messages)
+            content = response.content
+            sources = list(set(fact.source_url for fact in facts))
+            key_points = self._extract_key_points(content)
+            
+            return SectionDraft(
+                section_title=section_title,
+                content=content,
+                sources=sources,
+                key_points=key_points
+            )
+            
+        except Exception as e:
+            print(f"Error drafting section {section_title}: {e}")
+            return SectionDraft(
+                section_title=section_title,
+                content=f"Content for {section_title} could not be generated.",
+                sources=[],
+                key_points=[]
+            )
+    
+    def _build_messages(self, section_title: str, facts_text: str, section_index: int, total_sections: int) -> list:
+        """Build the drafting prompt for one section."""
         prompt = f"""
         Write the '{section_title}' section for a comprehensive article.
         
@@ -77,32 +131,10 @@ class DraftNode:
         Provide the content, list of source URLs used, and key points.
         """
         
-        messages = [
+        return [
             SystemMessage(content="You are a Wikipedia editor. Write clear, factual, well-structured content."),
             HumanMessage(content=prompt)
         ]
-        
-        try:
-            response = self.llm.invoke(messages)
-            content = response.content
-            sources = list(set(fact.source_url for fact in facts))
-            key_points = self._extract_key_points(content)
-            
-            return SectionDraft(
-                section_title=section_title,
-                content=content,
-                sources=sources,
-                key_points=key_points
-            )
-            
-        except Exception as e:
-            print(f"Error drafting section {section_title}: {e}")
-            return SectionDraft(
-                section_title=section_title,
-                content=f"Content for {section_title} could not be generated.",
-                sources=[],
-                key_points=[]
-            )
     
     def _extract_key_points(self, content: str) -> List[str]:
         """Extract key points from section content."""
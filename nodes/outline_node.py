@@ -1,9 +1,10 @@
 from typing import List, Dict, Any
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 from state import ResearchState
 from models.schemas import ArticleOutline
+from tools.llm import chat_model
+from tools.token_budget import TokenBudget, count_message_tokens
 from config import Config
 import json
 
@@ -11,7 +12,8 @@ class OutlineNode:
     """Node for generating article outline."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(model=Config.LLM_MODEL, temperature=0.2)
+        self.llm = chat_model(temperature=0.2)
+        self.budget = TokenBudget("outline")
     
     def __call__(self, state: ResearchState) -> Command[ResearchState]:
         """Generate article outline based on research."""
@@ -22,9 +24,19 @@ class OutlineNode:
         if not research_memory:
             return Command(update={"outline": None})
         
+        previous = state.get("previous")
+        if previous and previous.get("outline"):
+            # Keep the article's structure stable across refreshes so unchanged sections can be reused
+            outline = previous["outline"]
+            if custom_title and custom_title != outline.title:
+                outline = outline.model_copy(update={"title": custom_title})
+            print(f" Reusing outline from run {previous['run_id']} ({len(outline.sections)} sections)")
+            return Command(update={"outline": outline})
+        
         print(" Generating article outline...")
         
-        research_summary = self._prepare_research_summary(research_memory)
+        fixed_tokens = count_message_tokens(self._build_messages(topic, custom_title, ""))
+        research_summary = self._prepare_research_summary(research_memory, fixed_tokens)
         
         outline = self._generate_outline(topic, custom_title, research_summary)
         
@@ -32,44 +44,33 @@ class OutlineNode:
         
         return Command(update={"outline": outline})
     
-    def _prepare_research_summary(self, research_memory: dict) -> str:
+    def _prepare_research_summary(self, research_memory: dict, fixed_tokens: int = 0) -> str:
         """Prepare summary of research findings."""
-        summary = []
+        entries = []
         for perspective, facts in research_memory.items():
-            if facts:
+            for fact in facts[:3]:  # Top 3 facts per perspective
+                entries.append((perspective, f"- {fact.fact} (Source: {fact.source_url})", fact.confidence))
+        
+        # Over budget, the least confident facts are dropped first
+        kept = set(self.budget.fit(
+            [line for _, line, _ in entries],
+            fixed_tokens,
+            priority=[confidence for _, _, confidence in entries]
+        ))
+        
+        summary = []
+        for perspective in research_memory:
+            lines = [line for i, (p, line, _) in enumerate(entries) if p == perspective and i in kept]
+            if lines:
                 summary.append(f"## {perspective.replace('_', ' ').title()}")
-                for fact in facts[:3]:  # Top 3 facts per perspective
-                    summary.append(f"- {fact.fact} (Source: {fact.source_url})")
+                summary.extend(lines)
                 summary.append("")
         
         return "\n".join(summary)
     
     def _generate_outline(self, topic: str, custom_title: str, research_summary: str) -> ArticleOutline:
         """Generate structured article outline."""
-        prompt = f"""
-        Create a comprehensive Wikipedia-style outline for an article about: {topic}
-        
-        RESEARCH FINDINGS:
-        {research_summary}
-        
-        Requirements:
-        1. Create a logical, hierarchical structure
-        2. Include introduction and conclusion
-        3. Cover all major aspects found in research
-        4. Use clear, descriptive section headings
-        5. Include 2-3 subsections for main sections
-        6. Provide a brief summary of what the article will cover
-        """
-        
-        if custom_title:
-            prompt += f"\n7. Use this exact title: {custom_title}"
-        
-        prompt += "\n\nReturn as JSON with: title, sections (list with title, subsections), summary"
-        
-        messages = [
-            SystemMessage(content="You are an expert technical writer. Create clear, logical article outlines."),
-            HumanMessage(content=prompt)
-        ]
+        messages = self._build_messages(topic, custom_title, research_summary)
         
         try:
             response = self.llm.invoke(messages)
@@ -95,4 +96,31 @@ class OutlineNode:
                     {"title": "Conclusion", "subsections": []}
                 ],
                 summary=f"A comprehensive analysis of {topic} covering key aspects and implications."
-            )
\ No newline at end of file
+            )
+    
+    def _build_messages(self, topic: str, custom_title: str, research_summary: str) -> list:
+        """Build the outline prompt."""
+        prompt = f"""
+        Create a comprehensive Wikipedia-style outline for an article about: {topic}
+        
+        RESEARCH FINDINGS:
+        {research_summary}
+        
+        Requirements:
+        1. Create a logical, hierarchical structure
+        2. Include introduction and conclusion
+        3. Cover all major aspects found in research
+        4. Use clear, descriptive section headings
+        5. Include 2-3 subsections for main sections
+        6. Provide a brief summary of what the article will cover
+        """
+        
+        if custom_title:
+            prompt += f"\n7. Use this exact title: {custom_title}"
+        
+        prompt += "\n\nReturn as JSON with: title, sections (list with title, subsections), summary"
+        
+        return [
+            SystemMessage(content="You are an expert technical writer. Create clear, logical article outlines."),
+            HumanMessage(content=prompt)
+        ]
\ No newline at end of file
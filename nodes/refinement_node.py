@@ -1,16 +1,22 @@
+import asyncio
+from typing import List, Optional, Tuple
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 from state import ResearchState
+from tools.article_sections import join_sections, section_issues, split_sections
+from tools.llm import chat_model
+from tools.tracing import record
+from tools.token_budget import TokenBudget
 from config import Config
 
 class RefinementNode:
     """Node for final refinement and quality check."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(model=Config.LLM_MODEL, temperature=0.1)
+        self.llm = chat_model(temperature=0.1)
+        self.budget = TokenBudget("refinement")
     
-    def __call__(self, state: ResearchState) -> Command[ResearchState]:
+    async def __call__(self, state: ResearchState) -> Command[ResearchState]:
         """Perform final refinement and quality check."""
         final_article = state["final_article"]
         research_memory = state["research_memory"]
@@ -18,9 +24,16 @@ class RefinementNode:
         if not final_article or len(final_article.strip()) < 100:
             return Command(update={})  # No changes
         
+        previous = state.get("previous")
+        if previous and final_article == previous["final_article"]:
+            return Command(update={})  # Reused article is already refined
+        
         print("✨ Refining final article...")
         
-        refined_article = self._refine_article(final_article, research_memory)
+        if Config.REFINE_MODE == "sections":
+            refined_article = await self._refine_sections(final_article)
+        else:
+            refined_article = await self._refine_article(final_article, research_memory)
         
         citations = self._generate_citations(research_memory)
         
@@ -30,7 +43,7 @@ class RefinementNode:
         
         return Command(update={"final_article": final_output})
     
-    def _refine_article(self, article: str, research_memory: dict) -> str:
+    async def _refine_article(self, article: str, research_memory: dict) -> str:
         """Refine article for quality and accuracy."""
         prompt = f"""
         Review and refine the following article for:
@@ -52,13 +65,92 @@ class RefinementNode:
             HumanMessage(content=prompt)
         ]
         
+        # The article is the whole context, so an oversized one is left unrefined
+        if self.budget.exceeded(messages):
+            print(f" Article exceeds the refinement budget of {self.budget.limit} tokens, skipping refinement")
+            return article
+        
         try:
-            response = self.llm.invoke(messages)
+            response = await self.llm.ainvoke(messages)
             return response.content
         except Exception as e:
             print(f"Error in refinement: {e}")
             return article
     
+    async def _refine_sections(self, article: str) -> str:
+        """Refine the article's sections concurrently and reassemble them in order.
+        
+        Sections that pass the local quality check are kept as they are, so
+        latency is set by the slowest section that needs work.
+        """
+        sections = split_sections(article, Config.REFINE_SPLIT_LEVEL)
+        limit = asyncio.Semaphore(Config.REFINE_MAX_CONCURRENCY)
+        
+        async def refine(heading: str, body: str) -> Tuple[str, Optional[bool]]:
+            issues = section_issues(body, Config.REFINE_MAX_SENTENCE_WORDS)
+            if not body.strip() or not issues:
+                return body, None
+            
+            async with limit:
+                return await self._refine_section(heading, body, issues)
+        
+        results = await asyncio.gather(*(refine(heading, body) for heading, body in sections))
+        
+        # None: passed the check; False: needed refining but the model call failed
+        outcomes = [outcome for _, outcome in results]
+        refined, failed, skipped = outcomes.count(True), outcomes.count(False), outcomes.count(None)
+        record("sections_refined", refined)
+        record("sections_skipped", skipped)
+        record("sections_failed", failed)
+        print(f" Refined {refined}/{len(sections)} sections, {skipped} passed the quality check, {failed} failed")
+        
+        return join_sections([(heading, body) for (heading, _), (body, _) in zip(sections, results)])
+    
+    async def _refine_section(self, heading: str, body: str, issues: List[str]) -> Tuple[str, bool]:
+        """Refine one section's body, keeping its heading; returns the body and whether it was refined.
+        
+        The section is refined without the research facts, so the prompt asks
+        for editing only, not fact checking.
+        """
+        prompt = f"""
+        Review and refine the following section of an article for:
+        
+        1. Readability and flow
+        2. Grammar and spelling
+        3. Consistency of terms and tone
+        
+        An automatic check found: {"; ".join(issues)}.
+        
+        SECTION HEADING: {heading.lstrip("#").strip() or "(introduction)"}
+        
+        SECTION TEXT:
+        {body}
+        
+        Provide only the refined section text, without the heading, with minimal changes.
+        """
+        
+        messages = [
+            SystemMessage(content="You are a quality assurance editor. Improve articles while preserving content."),
+            HumanMessage(content=prompt)
+        ]
+        
+        if self.budget.exceeded(messages):
+            print(f" Section '{heading}' exceeds the refinement budget, leaving it unrefined")
+            return body, False
+        
+        try:
+            response = await self.llm.ainvoke(messages)
+            refined = response.content.strip()
+            # Models sometimes repeat the heading despite being asked not to
+            if heading and refined.startswith(heading):
+                refined = refined[len(heading):].strip()
+            if not refined:
+                return body, False
+            return refined, True
+        except Exception as e:
+            print(f"Error refining section '{heading}': {e}")
+            return body, False
+    
     def _generate_citations(self, research_memory: dict) -> str:
         """Generate citations section from research memory."""
         all_sources = set()
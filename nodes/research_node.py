@@ -1,9 +1,14 @@
-from typing import List
+import asyncio
+from typing import Dict, List
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 from state import ResearchState
-from models.schemas import ResearchFact
+from models.schemas import ResearchFact, SourceContent
+from tools.llm import chat_model
+from tools.chunk_index import ChunkIndex
+from tools.fact_consolidation import consolidate_facts
+from tools.urls import canonicalize_url
+from tools.token_budget import TokenBudget, count_message_tokens
 from config import Config
 import json
 
@@ -11,9 +16,9 @@ class ResearchNode:
     """Node for analyzing content from multiple perspectives."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(model=Config.LLM_MODEL, temperature=0.1)
+        self.llm = chat_model(temperature=0.1)
     
-    def __call__(self, state: ResearchState) -> Command[ResearchState]:
+    async def __call__(self, state: ResearchState) -> Command[ResearchState]:
         """Analyze source content from multiple perspectives."""
         source_contents = state["source_contents"]
         topic = state["topic"]
@@ -21,54 +26,102 @@ class ResearchNode:
         if not source_contents:
             return Command(update={"research_memory": {}})
         
-        print(f" Analyzing content from {len(source_contents)} sources...")
+        previous = state.get("previous")
+        if previous:
+            research_memory = await self._refresh(topic, source_contents, state.get("changed_sources") or [], previous)
+        else:
+            research_memory = await self._analyze_sources(topic, source_contents)
         
-        research_memory = {}
+        return Command(update={"research_memory": self._consolidate(research_memory)})
+    
+    def _consolidate(self, research_memory: Dict[str, List[ResearchFact]]) -> Dict[str, List[ResearchFact]]:
+        """Merge the same claim extracted from the same source by several perspectives."""
+        if not Config.FACT_CONSOLIDATION_ENABLED:
+            return research_memory
         
-        for perspective in Config.RESEARCH_PERSPECTIVES:
-            print(f"  Perspective: {perspective}")
-            facts = self._analyze_perspective(topic, perspective, source_contents)
-            research_memory[perspective] = facts
+        before = sum(len(facts) for facts in research_memory.values())
+        research_memory = consolidate_facts(
+            research_memory, Config.FACT_SIMHASH_DISTANCE, Config.FACT_MIN_OVERLAP
+        )
+        after = sum(len(facts) for facts in research_memory.values())
+        if after < before:
+            print(f" Consolidated {before} facts into {after} ({before - after} near-duplicates merged)")
         
-        total_facts = sum(len(facts) for facts in research_memory.values())
-        print(f" Extracted {total_facts} facts across {len(Config.RESEARCH_PERSPECTIVES)} perspectives")
+        return research_memory
+    
+    async def _refresh(self, topic: str, source_contents: List[SourceContent],
+                       changed_sources: List[str], previous: dict) -> Dict[str, List[ResearchFact]]:
+        """Keep the previous run's facts from unchanged sources and analyze only new or changed ones."""
+        changed = set(changed_sources)
+        current = {canonicalize_url(source.url) for source in source_contents}
+        stale = changed | (set(previous["source_hashes"]) - current)
+        
+        research_memory = {
+            perspective: [fact for fact in facts if canonicalize_url(fact.source_url) not in stale]
+            for perspective, facts in previous["research_memory"].items()
+        }
+        carried = sum(len(facts) for facts in research_memory.values())
+        
+        to_analyze = [source for source in source_contents if canonicalize_url(source.url) in changed]
+        if not to_analyze:
+            print(f" Sources unchanged, reusing {carried} facts from run {previous['run_id']}")
+            return research_memory
         
-        return Command(update={"research_memory": research_memory})
+        print(f" Reusing {carried} facts from unchanged sources")
+        new_facts = await self._analyze_sources(topic, to_analyze)
+        for perspective, facts in new_facts.items():
+            research_memory[perspective] = research_memory.get(perspective, []) + facts
+        
+        return research_memory
     
-    def _analyze_perspective(self, topic: str, perspective: str, sources: list) -> List[ResearchFact]:
-        """Analyze sources from a specific perspective."""
-        # Prepare source content for analysis
-        source_texts = []
-        for source in sources:
-            for chunk in source.chunks[:3]:  # Use first 3 chunks per source
-                source_texts.append(f"Source: {source.title}\nURL: {source.url}\nContent: {chunk}")
+    async def _analyze_sources(self, topic: str, source_contents: List[SourceContent]) -> Dict[str, List[ResearchFact]]:
+        """Extract facts from the sources for every perspective."""
+        print(f" Analyzing content from {len(source_contents)} sources...")
         
-        context = "\n\n".join(source_texts)
+        # One index for all perspectives; each ranks chunks against its own query
+        index = ChunkIndex(source_contents)
         
-        prompt = f"""
-        Analyze the following sources about '{topic}' from the perspective of: {perspective}
+        # Fan out all perspectives at once; each one handles its own failures
+        limit = asyncio.Semaphore(Config.RESEARCH_MAX_CONCURRENCY)
         
-        SOURCES:
-        {context}
+        async def analyze(perspective: str) -> List[ResearchFact]:
+            async with limit:
+                print(f"  Perspective: {perspective}")
+                try:
+                    return await asyncio.wait_for(
+                        self._analyze_perspective(topic, perspective, index),
+                        timeout=Config.RESEARCH_PERSPECTIVE_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    print(f"Research analysis for {perspective} timed out")
+                    return []
         
-        Extract 3-5 key facts, insights, and information relevant to {perspective}.
+        results = await asyncio.gather(*(analyze(p) for p in Config.RESEARCH_PERSPECTIVES))
+        research_memory = dict(zip(Config.RESEARCH_PERSPECTIVES, results))
         
-        For each fact, provide:
-        - The factual information
-        - Source URL it came from  
-        - Confidence level (0.0 to 1.0)
-        - Relevant tags
+        total_facts = sum(len(facts) for facts in research_memory.values())
+        print(f" Extracted {total_facts} facts across {len(Config.RESEARCH_PERSPECTIVES)} perspectives")
         
-        Return ONLY a JSON array of objects with these fields: fact, perspective, source_url, confidence, tags
-        """
+        return research_memory
+    
+    async def _analyze_perspective(self, topic: str, perspective: str, index: ChunkIndex) -> List[ResearchFact]:
+        """Analyze sources from a specific perspective."""
+        budget = TokenBudget("research")
+        fixed_tokens = count_message_tokens(self._build_messages(topic, perspective, ""))
         
-        messages = [
-            SystemMessage(content="You are a research assistant. Extract factual information from sources and return valid JSON."),
-            HumanMessage(content=prompt)
-        ]
+        # Send only the chunks most relevant to this perspective, within the node budget
+        query = f"{topic} {perspective.replace('_', ' ')} {Config.PERSPECTIVE_KEYWORDS.get(perspective, '')}"
+        chunks = index.top_chunks(query, Config.RESEARCH_TOP_K_CHUNKS, budget.available(fixed_tokens))
+        
+        source_texts = []
+        for source, chunk in chunks:
+            source_texts.append(f"Source: {source.title}\nURL: {source.url}\nContent: {chunk}")
+        source_texts = [source_texts[i] for i in budget.fit(source_texts, fixed_tokens)]
+        
+        messages = self._build_messages(topic, perspective, "\n\n".join(source_texts))
         
         try:
-            response = self.llm.invoke(messages)
+            response = await self.llm.ainvoke(messages)
             
             # Try to parse JSON response
             content = response.content.strip()
@@ -103,4 +156,28 @@ class ResearchNode:
             return []
         except Exception as e:
             print(f"Error in research analysis for {perspective}: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    def _build_messages(self, topic: str, perspective: str, context: str) -> list:
+        """Build the extraction prompt for one perspective."""
+        prompt = f"""
+        Analyze the following sources about '{topic}' from the perspective of: {perspective}
+        
+        SOURCES:
+        {context}
+        
+        Extract 3-5 key facts, insights, and information relevant to {perspective}.
+        
+        For each fact, provide:
+        - The factual information
+        - Source URL it came from  
+        - Confidence level (0.0 to 1.0)
+        - Relevant tags
+        
+        Return ONLY a JSON array of objects with these fields: fact, perspective, source_url, confidence, tags
+        """
+        
+        return [
+            SystemMessage(content="You are a research assistant. Extract factual information from sources and return valid JSON."),
+            HumanMessage(content=prompt)
+        ]
\ No newline at end of file
@@ -1,6 +1,15 @@
+import asyncio
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
 from langgraph.types import Command
 from state import ResearchState
+from models.schemas import SearchResult, SourceContent
 from tools.web_scraper import WebScraper
+from tools.incremental import source_hashes
+from tools.source_dedupe import find_duplicate_sources
+from tools.tokens import count_tokens
+from tools.tracing import record
+from config import Config
 
 class RetrieveNode:
     """Node for retrieving and parsing web content."""
@@ -8,7 +17,7 @@ class RetrieveNode:
     def __init__(self):
         self.scraper = WebScraper()
     
-    def __call__(self, state: ResearchState) -> Command[ResearchState]:
+    async def __call__(self, state: ResearchState) -> Command[ResearchState]:
         """Retrieve and parse content from search results."""
         search_results = state["search_results"]
         
@@ -17,11 +26,20 @@ class RetrieveNode:
         
         print(f" Retrieving content from {len(search_results)} URLs...")
         
+        # A refresh has to see changed pages, so cached copies are revalidated with the server
+        previous = state.get("previous")
+        revalidate = bool(previous)
+        
+        if Config.ASYNC_RETRIEVAL:
+            contents = await self._retrieve_concurrently(search_results, revalidate)
+        else:
+            contents = await asyncio.to_thread(self._retrieve_sequentially, search_results, revalidate)
+        
         source_contents = []
         successful_retrievals = 0
         
-        for result in search_results:
-            content = self.scraper.scrape_url(result.url)
+        # Contents line up with search_results, so rank order is preserved
+        for result, content in zip(search_results, contents):
             if content:
                 source_contents.append(content)
                 successful_retrievals += 1
@@ -31,4 +49,91 @@ class RetrieveNode:
         
         print(f" Successfully retrieved {successful_retrievals}/{len(search_results)} sources")
         
-        return Command(update={"source_contents": source_contents})
\ No newline at end of file
+        cache_statuses = [content.metadata.get("cache") for content in source_contents]
+        if any(cache_statuses):
+            hits = cache_statuses.count("hit") + cache_statuses.count("revalidated")
+            print(f" Page cache: {hits} hits ({cache_statuses.count('revalidated')} revalidated), {cache_statuses.count('miss')} misses")
+        
+        # Fingerprinting is CPU-bound, so it runs off the event loop that other runs share
+        source_contents = await asyncio.to_thread(self._drop_duplicates, source_contents)
+        
+        if not previous:
+            return Command(update={"source_contents": source_contents, "changed_sources": None})
+        
+        return Command(update={
+            "source_contents": source_contents,
+            "changed_sources": self._diff_sources(source_contents, previous["source_hashes"])
+        })
+    
+    def _drop_duplicates(self, source_contents: List[SourceContent]) -> List[SourceContent]:
+        """Drop near-duplicate copies of a page, keeping the highest-ranked one.
+        
+        The kept source lists the dropped copies' URLs in metadata["duplicates"].
+        """
+        if not Config.SOURCE_DEDUPE_ENABLED or len(source_contents) < 2:
+            return source_contents
+        
+        pairs = find_duplicate_sources(
+            source_contents,
+            threshold=Config.SOURCE_DUPLICATE_THRESHOLD,
+            shingle_size=Config.SOURCE_SHINGLE_SIZE,
+            signature_size=Config.SOURCE_SIGNATURE_SIZE
+        )
+        if not pairs:
+            return source_contents
+        
+        duplicates: Dict[int, List[str]] = {}
+        for duplicate, original in pairs:
+            duplicates.setdefault(original, []).append(source_contents[duplicate].url)
+            print(f" Duplicate: {source_contents[duplicate].url} (same as {source_contents[original].url})")
+        
+        dropped = {duplicate for duplicate, _ in pairs}
+        saved_bytes = sum(len(source_contents[i].content.encode("utf-8")) for i in dropped)
+        saved_tokens = sum(count_tokens(source_contents[i].content) for i in dropped)
+        record("duplicate_sources", len(dropped))
+        record("duplicate_bytes_saved", saved_bytes)
+        record("duplicate_tokens_saved", saved_tokens)
+        print(f" Dropped {len(dropped)} near-duplicate sources: {saved_bytes / 1024:.1f} KB, "
+              f"~{saved_tokens} tokens kept out of research prompts")
+        
+        return [
+            content.model_copy(update={"metadata": {**content.metadata, "duplicates": duplicates[i]}})
+            if i in duplicates else content
+            for i, content in enumerate(source_contents)
+            if i not in dropped
+        ]
+    
+    def _diff_sources(self, source_contents: List[SourceContent], previous_hashes: Dict[str, str]) -> List[str]:
+        """Canonical URLs of sources that are new or whose content changed since the previous run."""
+        current_hashes = source_hashes(source_contents)
+        changed = [url for url, digest in current_hashes.items() if previous_hashes.get(url) != digest]
+        
+        new = sum(1 for url in changed if url not in previous_hashes)
+        dropped = sum(1 for url in previous_hashes if url not in current_hashes)
+        print(f" Incremental: {new} new, {len(changed) - new} changed, "
+              f"{len(current_hashes) - len(changed)} unchanged, {dropped} dropped sources")
+        
+        return changed
+    
+    def _retrieve_sequentially(self, search_results: List[SearchResult],
+                               revalidate: bool = False) -> List[Optional[SourceContent]]:
+        """Fetch each result one after another with the blocking scraper."""
+        return [self.scraper.scrape_url(result.url, revalidate) for result in search_results]
+    
+    async def _retrieve_concurrently(self, search_results: List[SearchResult],
+                                     revalidate: bool = False) -> List[Optional[SourceContent]]:
+        """Fetch all results at once, bounded per host and, across concurrent runs, globally."""
+        global_limit = self.scraper.fetch_limit()
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        
+        async def fetch(client, url: str) -> Optional[SourceContent]:
+            host = urlparse(url).netloc.lower()
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(Config.RETRIEVAL_PER_HOST_CONCURRENCY)
+            
+            async with global_limit, host_limits[host]:
+                return await self.scraper.ascrape_url(client, url, revalidate)
+        
+        # The client outlives the run so its keep-alive connections are reused
+        client = self.scraper.async_client()
+        return await asyncio.gather(*(fetch(client, result.url) for result in search_results))
\ No newline at end of file
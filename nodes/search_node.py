@@ -1,25 +1,28 @@
+import asyncio
 from typing import List
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage
 from state import ResearchState
-from tools.search_tool import SearchTool
+from models.schemas import SearchResult
+from tools.search_tool import SearchTool, reciprocal_rank_fusion
 from config import Config
 
 class SearchNode:
     """Node for performing web searches."""
     
     def __init__(self):
-        self.search_tool = SearchTool(Config.SEARCH_PROVIDER)
+        self.search_tool = SearchTool(Config.SEARCH_PROVIDER, Config.SEARCH_HEDGE_PROVIDER)
     
-    def __call__(self, state: ResearchState) -> Command[ResearchState]:
+    async def __call__(self, state: ResearchState) -> Command[ResearchState]:
         """Execute search for the given topic."""
         topic = state["topic"]
         
         print(f" Searching for: {topic}")
         
-        search_query = self._generate_search_query(topic)
+        search_queries = self._generate_search_queries(topic)
+        search_query = search_queries[0]
         
-        search_results = self.search_tool.search(search_query, Config.MAX_SEARCH_RESULTS)
+        search_results = await self._search_all(search_queries)
         
         if not search_results:
             return Command(
@@ -40,6 +43,30 @@ class SearchNode:
             }
         )
     
+    async def _search_all(self, queries: List[str]) -> List[SearchResult]:
+        """Run every query at once and fuse the rankings, one result per canonical URL."""
+        # The search tool blocks, so each query gets a worker thread; the provider's
+        # rate limiter still bounds how many reach the API at once
+        result_lists = await asyncio.gather(*(
+            asyncio.to_thread(self.search_tool.search, query, Config.MAX_SEARCH_RESULTS)
+            for query in queries
+        ))
+        
+        if len(queries) == 1:
+            return reciprocal_rank_fusion(result_lists)
+        
+        fused = reciprocal_rank_fusion(result_lists, Config.SEARCH_RRF_K, Config.SEARCH_FUSED_RESULTS)
+        print(f" Fused {sum(len(results) for results in result_lists)} results from "
+              f"{len(queries)} queries into {len(fused)} sources")
+        return fused
+    
+    def _generate_search_queries(self, topic: str) -> List[str]:
+        """The main query, plus one per research perspective in "perspectives" mode."""
+        queries = [self._generate_search_query(topic)]
+        if Config.SEARCH_QUERY_MODE == "perspectives":
+            queries += [f"{topic} {perspective.replace('_', ' ')}" for perspective in Config.RESEARCH_PERSPECTIVES]
+        return queries
+    
     def _generate_search_query(self, topic: str) -> str:
         """Generate optimized search query from topic."""
-        return f"{topic} recent developments 2024 research"
\ No newline at end of file
+        return f"{topic} {Config.SEARCH_QUERY_SUFFIX}"
\ No newline at end of file
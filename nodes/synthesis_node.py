@@ -1,17 +1,19 @@
 from typing import List
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 from state import ResearchState
+from tools.llm import chat_model
+from tools.token_budget import TokenBudget, count_message_tokens
 from config import Config
 
 class SynthesisNode:
     """Node for synthesizing draft sections into final article."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(model=Config.LLM_MODEL, temperature=0.2)
+        self.llm = chat_model(temperature=0.2)
+        self.budget = TokenBudget("synthesis")
     
-    def __call__(self, state: ResearchState) -> Command[ResearchState]:
+    async def __call__(self, state: ResearchState) -> Command[ResearchState]:
         """Synthesize all sections into final article."""
         draft_sections = state["draft_sections"]
         outline = state["outline"]
@@ -19,6 +21,12 @@ class SynthesisNode:
         if not draft_sections or not outline:
             return Command(update={"final_article": "No content available."})
         
+        # On a refresh where every section was reused, the previous article still holds
+        previous = state.get("previous")
+        if previous and previous["final_article"] and self._same_drafts(draft_sections, previous["draft_sections"]):
+            print(f" No sections changed, reusing article from run {previous['run_id']}")
+            return Command(update={"final_article": previous["final_article"]})
+        
         print(" Synthesizing final article...")
         
         section_contents = []
@@ -28,9 +36,13 @@ class SynthesisNode:
                 draft = draft_sections[section_title]
                 section_contents.append(f"## {section_title}\n\n{draft.content}")
         
+        # Over budget, every section is cut back to an equal share of the context
+        fixed_tokens = count_message_tokens(self._build_messages(outline.title, outline.summary, ""))
+        section_contents = self.budget.share(section_contents, fixed_tokens)
+        
         all_content = "\n\n".join(section_contents)
         
-        final_article = self._synthesize_article(
+        final_article = await self._synthesize_article(
             outline.title,  # Use the title from outline (could be custom or generated)
             outline.summary,
             all_content
@@ -40,8 +52,25 @@ class SynthesisNode:
         
         return Command(update={"final_article": final_article})
     
-    def _synthesize_article(self, title: str, summary: str, content: str) -> str:
+    def _same_drafts(self, drafts: dict, previous_drafts: dict) -> bool:
+        """Check whether every section draft matches the previous run's."""
+        return drafts.keys() == previous_drafts.keys() and all(
+            drafts[title].content == previous_drafts[title].content for title in drafts
+        )
+    
+    async def _synthesize_article(self, title: str, summary: str, content: str) -> str:
         """Synthesize cohesive final article."""
+        messages = self._build_messages(title, summary, content)
+        
+        try:
+            response = await self.llm.ainvoke(messages)
+            return response.content
+        except Exception as e:
+            print(f"Error in synthesis: {e}")
+            return f"# {title}\n\n{summary}\n\n{content}"
+    
+    def _build_messages(self, title: str, summary: str, content: str) -> list:
+        """Build the synthesis prompt."""
         prompt = f"""
         Transform the following draft sections into a polished, cohesive Wikipedia-style article.
         
@@ -61,18 +90,12 @@ class SynthesisNode:
         7. Keep all essential information and citations
         8. Format with proper Markdown headings
         9. Ensure the article is self-contained and informative
+        10. Keep the article under {Config.MAX_ARTICLE_LENGTH} words
         
         Return the complete, polished article.
         """
         
-        messages = [
+        return [
             SystemMessage(content="You are a senior editor. Create polished, professional articles from draft content."),
             HumanMessage(content=prompt)
-        ]
-        
-        try:
-            response = self.llm.invoke(messages)
-            return response.content
-        except Exception as e:
-            print(f"Error in synthesis: {e}")
-            return f"# {title}\n\n{summary}\n\n{content}"
\ No newline at end of file
+        ]
\ No newline at end of file
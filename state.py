@@ -6,6 +6,10 @@ class ResearchState(TypedDict):
     
     # User input
     topic: str
+    title: Optional[str]
+    
+    # Incremental refresh: what the previous run produced (None for a full run)
+    previous: Optional[Dict[str, Any]]
     
     # Search phase
     search_results: List[SearchResult]
@@ -13,6 +17,7 @@ class ResearchState(TypedDict):
     
     # Retrieval phase  
     source_contents: List[SourceContent]
+    changed_sources: Optional[List[str]]
     
     # Research phase
     research_memory: Dict[str, List[ResearchFact]]
@@ -22,6 +27,7 @@ class ResearchState(TypedDict):
     
     # Drafting phase
     draft_sections: Dict[str, SectionDraft]
+    section_facts: Dict[str, List[str]]
     current_section: Optional[str]
     
     # Synthesis phase
@@ -1,12 +1,15 @@
 import streamlit as st
 import asyncio
 import sys
+import time
 import os
 from pathlib import Path
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from tools.clients import run_sync, iterate_sync
+
 # Set page config
 st.set_page_config(
     page_title="AutoResearch Agent",
@@ -58,6 +61,25 @@ if 'is_processing' not in st.session_state:
 if 'article_generated' not in st.session_state:
     st.session_state.article_generated = False
 
+# Graph nodes in pipeline order, with the label shown while each one runs
+PIPELINE_STAGES = {
+    "search": " Searching the web...",
+    "retrieve": " Retrieving content...",
+    "research": " Analyzing information...",
+    "outline": " Generating outline...",
+    "draft": " Drafting sections...",
+    "synthesize": " Synthesizing article...",
+    "refine": " Final refinement..."
+}
+
+def format_stage_timings(stage_timings: dict) -> str:
+    """Markdown list of finished stages and how long each took."""
+    lines = []
+    for node, label in PIPELINE_STAGES.items():
+        if node in stage_timings:
+            lines.append(f"- ✅ {label.strip().rstrip('.')}: {stage_timings[node]:.1f}s")
+    return "\n".join(lines)
+
 # Title and description
 st.markdown('<h1 class="main-header"> AutoResearch Agent</h1>', unsafe_allow_html=True)
 st.markdown("""
@@ -159,16 +181,26 @@ with col2:
         st.markdown(f"**Article Stats:**")
         st.markdown(f"- Words: {word_count}")
         st.markdown(f"- Characters: {char_count}")
+        
+        # Time spent in each pipeline stage
+        stage_timings = result.get("stage_timings")
+        if stage_timings:
+            st.markdown(f"**Stage Timings** (total {sum(stage_timings.values()):.1f}s):")
+            st.markdown(format_stage_timings(stage_timings))
+
+# One agent per server process, shared by every session and rerun
+@st.cache_resource
+def load_agent():
+    """Build the research agent once, with its graph and HTTP/LLM clients."""
+    from autoresearch import get_agent
+    return get_agent()
 
 # Function to run research
 async def run_research_async(topic: str, custom_title: str = None):
     """Run the research asynchronously."""
     try:
-        # Import and run the agent
-        from main import AutoResearchAgent
-        
-        agent = AutoResearchAgent()
-        result = await agent.research(topic)
+        agent = load_agent()
+        result = await agent.research(topic, title=custom_title)
         
         # Update custom title if provided
         if custom_title and result.get("success"):
@@ -184,8 +216,74 @@ async def run_research_async(topic: str, custom_title: str = None):
         }
 
 def run_research(topic: str, custom_title: str = None):
-    """Wrapper to run async research."""
-    return asyncio.run(run_research_async(topic, custom_title))
+    """Wrapper to run async research on the shared event loop."""
+    return run_sync(run_research_async(topic, custom_title))
+
+def stream_research(topic: str, custom_title: str = None, article_placeholder=None,
+                    progress_bar=None, status_placeholder=None):
+    """Run the research, rendering progress and the article into placeholders as it runs.
+    
+    The graph runs on the shared event loop; events are rendered here on the
+    session's own script thread.
+    """
+    try:
+        agent = load_agent()
+        article = ""
+        article_node = None
+        last_render = 0.0
+        result = None
+        started = {}
+        stage_timings = {}
+        
+        for event in iterate_sync(agent.research_stream(topic, title=custom_title)):
+            if event["type"] == "node_start":
+                node = event["node"]
+                started[node] = time.perf_counter()
+                if progress_bar is not None and node in PIPELINE_STAGES:
+                    done = list(PIPELINE_STAGES).index(node)
+                    progress_bar.progress(done / len(PIPELINE_STAGES), text=PIPELINE_STAGES[node])
+            elif event["type"] == "node_end":
+                node = event["node"]
+                if node in started:
+                    stage_timings[node] = time.perf_counter() - started.pop(node)
+                if status_placeholder is not None:
+                    status_placeholder.markdown(format_stage_timings(stage_timings))
+            elif event["type"] == "token":
+                # A later node rewrites the whole article; the draft stays up until its text arrives
+                # (section refinement streams no tokens, so the draft is shown until the result)
+                if event["node"] != article_node:
+                    article = ""
+                    article_node = event["node"]
+                article += event["content"]
+                # Re-rendering markdown on every token is slow; redraw a few times a second
+                now = time.monotonic()
+                if article_placeholder is not None and now - last_render >= 0.1:
+                    article_placeholder.markdown(article + " ▌")
+                    last_render = now
+            elif event["type"] == "result":
+                result = event["result"]
+        
+        if article_placeholder is not None:
+            article_placeholder.markdown(result.get("final_article", article) if result else article)
+        
+        if progress_bar is not None:
+            progress_bar.progress(1.0, text="Research complete")
+        
+        if result is not None:
+            result["stage_timings"] = stage_timings
+        
+        # Update custom title if provided
+        if custom_title and result and result.get("success"):
+            result["title"] = custom_title
+        
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "topic": topic
+        }
 
 # Handle research button click
 if research_button and topic:
@@ -197,30 +295,17 @@ if research_button and topic:
     # Create placeholder for status updates
     status_placeholder = st.empty()
     
-    # Simulate progress updates
-    progress_stages = [
-        " Searching the web...",
-        " Retrieving content...",
-        " Analyzing information...",
-        " Generating outline...",
-        " Drafting sections...",
-        " Synthesizing article...",
-        " Final refinement..."
-    ]
-    
     try:
-        for i, stage in enumerate(progress_stages):
-            progress = (i + 1) / len(progress_stages)
-            progress_bar.progress(progress, text=stage)
-            status_placeholder.info(stage)
-            
-            # Small delay to show progress
-            import time
-            time.sleep(0.5)
-        
-        # Run the actual research
-        with st.spinner("🚀 Generating your article..."):
-            result = run_research(topic, custom_title if use_custom_title else None)
+        # Progress follows the graph's own node events, and the article shows up as it is written
+        article_placeholder = st.empty()
+        result = stream_research(
+            topic,
+            custom_title if use_custom_title else None,
+            article_placeholder,
+            progress_bar,
+            status_placeholder
+        )
+        article_placeholder.empty()
         
         # Store result in session state
         st.session_state.research_result = result
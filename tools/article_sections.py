@@ -0,0 +1,92 @@
+import re
+from typing import List, Tuple
+
+HEADING = re.compile(r"^(#{1,6})\s+\S")
+
+# Sentence ends followed by whitespace; good enough for checking prose, not for parsing it
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+REPEATED_WORD = re.compile(r"\b(\w+)\s+\1\b", re.IGNORECASE)
+EXTRA_SPACE = re.compile(r"\S {2,}\S|\w [,.;:!?](?:\s|$)")
+
+def split_sections(article: str, level: int = 2) -> List[Tuple[str, str]]:
+    """Split a Markdown article into (heading, body) pairs at headings of up to level.
+    
+    Text before the first heading gets an empty heading, deeper headings stay
+    in their section's body, and lines inside code fences are never headings.
+    """
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    in_fence = False
+    
+    for line in article.split("\n"):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING.match(line)
+        if match and len(match.group(1)) <= level:
+            sections.append((line, []))
+        else:
+            sections[-1][1].append(line)
+    
+    return [
+        (heading, "\n".join(lines).strip("\n"))
+        for heading, lines in sections
+        if heading or "".join(lines).strip()
+    ]
+
+def join_sections(sections: List[Tuple[str, str]]) -> str:
+    """Reassemble (heading, body) pairs into an article."""
+    return "\n\n".join(
+        "\n\n".join(part for part in (heading, body.strip("\n")) if part)
+        for heading, body in sections
+    )
+
+def _prose_lines(body: str) -> List[str]:
+    """Paragraph lines of a body, leaving out headings, lists, tables, quotes and code."""
+    lines = []
+    in_fence = False
+    for line in body.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence or not stripped or stripped[0] in "#-*+|>" or re.match(r"\d+[.)]\s", stripped):
+            continue
+        lines.append(stripped)
+    return lines
+
+def section_issues(body: str, max_sentence_words: int = 40) -> List[str]:
+    """Problems a cheap local check finds in a section body; an empty list means it passes.
+    
+    This catches the mechanical faults refinement fixes (stutters, repeated
+    or run-on sentences, stray spacing, unclosed brackets or code blocks,
+    text cut off mid-sentence), not questions of accuracy or style.
+    """
+    issues = []
+    prose = _prose_lines(body)
+    text = " ".join(prose)
+    
+    repeated = REPEATED_WORD.search(text)
+    if repeated:
+        issues.append(f"repeated word \"{repeated.group(0)}\"")
+    
+    sentences = [sentence.lower() for sentence in SENTENCE_END.split(text) if sentence]
+    if len(set(sentences)) < len(sentences):
+        issues.append("repeated sentence")
+    
+    longest = max((len(sentence.split()) for sentence in sentences), default=0)
+    if longest > max_sentence_words:
+        issues.append(f"sentence of {longest} words")
+    
+    if any(EXTRA_SPACE.search(line) for line in prose):
+        issues.append("stray spacing")
+    
+    if body.count("(") != body.count(")") or body.count("[") != body.count("]"):
+        issues.append("unbalanced brackets")
+    
+    if body.count("```") % 2:
+        issues.append("unclosed code block")
+    
+    if prose and not prose[-1].endswith((".", "!", "?", ":", ")", "\"", "*")):
+        issues.append("unfinished last sentence")
+    
+    return issues
\ No newline at end of file
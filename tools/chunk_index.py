@@ -0,0 +1,90 @@
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+import numpy as np
+from models.schemas import SourceContent
+from tools.tokens import count_tokens
+
+_TERM = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about above after again against all also an and any are as at be because been before
+being between both but by can could did do does doing during each few for from further
+had has have having he her here hers him his how i if in into is it its itself just me
+more most my no nor not now of off on once only or other our ours out over own same she
+should so some such than that the their theirs them then there these they this those
+through to too under until up very was we were what when where which while who whom why
+will with would you your yours
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word terms with stopwords and single characters removed."""
+    return [t for t in _TERM.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+class ChunkIndex:
+    """In-memory BM25 index over the chunks of retrieved sources."""
+    
+    def __init__(self, sources: List[SourceContent], k1: float = 1.5, b: float = 0.75):
+        self.entries: List[Tuple[SourceContent, str]] = [
+            (source, chunk) for source in sources for chunk in source.chunks
+        ]
+        self.k1 = k1
+        self.b = b
+        
+        # Postings per term: which chunks contain it and how often
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = np.zeros(len(self.entries), dtype=np.float32)
+        for i, (_, chunk) in enumerate(self.entries):
+            terms = Counter(tokenize(chunk))
+            lengths[i] = sum(terms.values())
+            for term, tf in terms.items():
+                docs, tfs = postings.setdefault(term, ([], []))
+                docs.append(i)
+                tfs.append(tf)
+        
+        n = max(len(self.entries), 1)
+        self._postings = {
+            term: (np.array(docs, dtype=np.int32), np.array(tfs, dtype=np.float32))
+            for term, (docs, tfs) in postings.items()
+        }
+        self._idf = {
+            term: float(np.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5)))
+            for term, (docs, _) in self._postings.items()
+        }
+        average = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+        self._norm = k1 * (1 - b + b * lengths / average)
+    
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for a query."""
+        scores = np.zeros(len(self.entries), dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+            docs, tfs = self._postings[term]
+            scores[docs] += self._idf[term] * tfs * (self.k1 + 1) / (tfs + self._norm[docs])
+        return scores
+    
+    def top_chunks(self, query: str, k: int, token_budget: int) -> List[Tuple[SourceContent, str]]:
+        """Best-scoring chunks for a query, up to k chunks and token_budget tokens.
+        
+        Ties keep source rank order, and the selection is returned in that order
+        so chunks from the same source stay together in the prompt. Chunks that
+        do not match the query are left out, unless none match at all, in which
+        case the leading chunks are used.
+        """
+        scores = self.scores(query)
+        matched = bool(len(scores)) and scores.max() > 0
+        order = np.argsort(-scores, kind="stable") if matched else range(len(self.entries))
+        
+        selected = []
+        used = 0
+        for i in order:
+            if len(selected) >= k or (matched and scores[i] <= 0):
+                break
+            tokens = count_tokens(self.entries[i][1])
+            if used + tokens > token_budget:
+                continue
+            selected.append(int(i))
+            used += tokens
+        
+        return [self.entries[i] for i in sorted(selected)]
\ No newline at end of file
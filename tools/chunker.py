@@ -0,0 +1,73 @@
+import re
+from collections import deque
+from typing import Callable, Iterator, Tuple
+from tools.tokens import count_tokens
+
+_WORD = re.compile(r'\S+')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+def iter_chunks(text: str, chunk_size: int = 500, overlap: int = 0,
+                unit: str = "chars", boundary: str = "sentence") -> Iterator[str]:
+    """Yield chunks of at most chunk_size chars or tokens in a single linear pass.
+    
+    boundary is "word", "sentence" or "paragraph"; segments that are too large on
+    their own fall back to the next finer boundary. overlap repeats up to that many
+    chars or tokens from the end of one chunk at the start of the next.
+    """
+    if unit not in ("chars", "tokens"):
+        raise ValueError(f"Unsupported chunk unit: {unit}")
+    
+    measure = len if unit == "chars" else count_tokens
+    separator = 1 if unit == "chars" else 0
+    
+    window = deque()
+    window_size = 0
+    fresh = 0  # segments added since the last chunk was emitted
+    
+    for segment, size in _segments(text, boundary, chunk_size, measure):
+        if window and window_size + separator + size > chunk_size:
+            if fresh:
+                yield " ".join(s for s, _ in window)
+                fresh = 0
+            
+            # Keep the overlap tail, but always leave room for the new segment
+            while window and (window_size > overlap or window_size + separator + size > chunk_size):
+                _, dropped = window.popleft()
+                window_size -= dropped + (separator if window else 0)
+            if not window:
+                window_size = 0
+        
+        window_size += size + (separator if window else 0)
+        window.append((segment, size))
+        fresh += 1
+    
+    if fresh:
+        yield " ".join(s for s, _ in window)
+
+def _segments(text: str, boundary: str, chunk_size: int,
+              measure: Callable[[str], int]) -> Iterator[Tuple[str, int]]:
+    """Split text into (segment, size) pairs along the requested boundary."""
+    if boundary == "word":
+        for match in _WORD.finditer(text):
+            word = match.group()
+            yield word, measure(word)
+        return
+    
+    if boundary == "paragraph":
+        splitter, finer = _PARAGRAPH_BREAK, "sentence"
+    elif boundary == "sentence":
+        splitter, finer = _SENTENCE_END, "word"
+    else:
+        raise ValueError(f"Unsupported chunk boundary: {boundary}")
+    
+    for piece in splitter.split(text):
+        piece = " ".join(piece.split())
+        if not piece:
+            continue
+        
+        size = measure(piece)
+        if size > chunk_size:
+            yield from _segments(piece, finer, chunk_size, measure)
+        else:
+            yield piece, size
\ No newline at end of file
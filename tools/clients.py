@@ -0,0 +1,65 @@
+import asyncio
+import queue
+import threading
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+import requests
+
+T = TypeVar("T")
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide HTTP session, so connections are pooled across nodes and runs."""
+    global _session
+    
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop, running on a background thread.
+    
+    Async clients are bound to the loop they first ran on, so blocking callers
+    share this one loop instead of starting a new one per request.
+    """
+    global _loop
+    
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="autoresearch-loop", daemon=True).start()
+        return _loop
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine on the shared loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+def iterate_sync(items: AsyncIterator[T]) -> Iterator[T]:
+    """Consume an async iterator on the shared loop from a blocking caller."""
+    received: "queue.Queue" = queue.Queue()
+    finished = object()
+    
+    async def pump():
+        try:
+            async for item in items:
+                received.put(item)
+        finally:
+            received.put(finished)
+    
+    future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+    try:
+        while True:
+            item = received.get()
+            if item is finished:
+                break
+            yield item
+        
+        # Surface any error raised while iterating
+        future.result()
+    finally:
+        future.cancel()
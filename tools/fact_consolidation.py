@@ -0,0 +1,147 @@
+import hashlib
+from typing import Dict, List, Tuple
+import numpy as np
+from models.schemas import ResearchFact
+from tools.chunk_index import tokenize
+from tools.urls import canonicalize_url
+
+SIMHASH_BITS = 64
+
+# Suffixes stripped so inflections of a word ("breaks", "breaking") count as one term
+SUFFIXES = ("ing", "ed", "es", "s", "ly")
+
+# Numbers usually decide what a claim says ("by 2030" vs "by 2035"), so they weigh more
+NUMBER_WEIGHT = 3
+
+def _stem(term: str) -> str:
+    if any(c.isdigit() for c in term):
+        return term
+    for suffix in SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[:-len(suffix)]
+    return term
+
+def _term_hash(term: str) -> int:
+    # blake2b rather than hash(), which is salted per process
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+
+def fact_terms(text: str) -> List[str]:
+    """Stemmed terms of a fact, as compared for near-duplicates."""
+    return [_stem(term) for term in tokenize(text)]
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the text's stemmed terms; similar texts differ in few bits."""
+    return _fingerprint(fact_terms(text))
+
+def _fingerprint(terms: List[str]) -> int:
+    if not terms:
+        return 0
+    
+    hashes = np.array([_term_hash(term) for term in terms], dtype=np.uint64)
+    weights = np.array([NUMBER_WEIGHT if term[0].isdigit() else 1 for term in terms], dtype=np.int64)
+    bits = ((hashes[:, None] >> np.arange(SIMHASH_BITS, dtype=np.uint64)) & np.uint64(1)).astype(np.int64)
+    # Each term votes its weight for its set bits and against the others
+    votes = ((2 * bits - 1) * weights[:, None]).sum(axis=0)
+    return sum(1 << int(bit) for bit in np.flatnonzero(votes > 0))
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def _bands(fingerprint: int, count: int) -> List[Tuple[int, int]]:
+    """Split a fingerprint into count bands of (nearly) equal width."""
+    width = -(-SIMHASH_BITS // count)
+    mask = (1 << width) - 1
+    return [(band, (fingerprint >> (band * width)) & mask) for band in range(count)]
+
+def combined_confidence(confidences: List[float]) -> float:
+    """Noisy-OR of the confidences: the claim holds unless every extraction is wrong."""
+    doubt = 1.0
+    for confidence in confidences:
+        doubt *= 1.0 - min(max(confidence, 0.0), 1.0)
+    return round(1.0 - doubt, 4)
+
+def consolidate_facts(research_memory: Dict[str, List[ResearchFact]],
+                      max_distance: int = 6, min_overlap: float = 0.5) -> Dict[str, List[ResearchFact]]:
+    """Merge near-duplicate facts from the same source across perspectives.
+    
+    Facts whose SimHash fingerprints are within max_distance bits are
+    clustered. Splitting fingerprints into max_distance + 1 bands means any
+    such pair shares a band exactly, so only facts that collide in a band
+    bucket are compared, which keeps this near-linear in the number of facts.
+    Short facts give coarse fingerprints, so candidates must also share at
+    least min_overlap of their terms (Jaccard).
+    Each cluster keeps its most confident fact under that fact's perspective,
+    with the cluster's perspectives and tags merged and a combined confidence.
+    """
+    entries = [fact for facts in research_memory.values() for fact in facts]
+    if len(entries) < 2:
+        return research_memory
+    
+    terms = [fact_terms(fact.fact) for fact in entries]
+    term_sets = [set(t) for t in terms]
+    fingerprints = [_fingerprint(t) for t in terms]
+    sources = [canonicalize_url(fact.source_url) for fact in entries]
+    parent = list(range(len(entries)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    buckets: Dict[Tuple[str, int, int], List[int]] = {}
+    for i, fingerprint in enumerate(fingerprints):
+        if not fingerprint:
+            continue
+        for band, value in _bands(fingerprint, max_distance + 1):
+            bucket = buckets.setdefault((sources[i], band, value), [])
+            for j in bucket:
+                if (find(i) != find(j)
+                        and hamming_distance(fingerprint, fingerprints[j]) <= max_distance
+                        and jaccard(term_sets[i], term_sets[j]) >= min_overlap):
+                    parent[find(i)] = find(j)
+            bucket.append(i)
+    
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(entries)):
+        clusters.setdefault(find(i), []).append(i)
+    
+    canonical: Dict[int, ResearchFact] = {}
+    for members in clusters.values():
+        facts = [entries[i] for i in members]
+        # Most confident fact wins; ties go to the one extracted first
+        best = max(range(len(facts)), key=lambda k: (facts[k].confidence, -k))
+        if len(facts) == 1:
+            canonical[members[best]] = facts[best]
+            continue
+        
+        perspectives: List[str] = []
+        tags: List[str] = []
+        for fact in [facts[best]] + facts[:best] + facts[best + 1:]:
+            for perspective in fact.perspectives or [fact.perspective]:
+                if perspective not in perspectives:
+                    perspectives.append(perspective)
+            for tag in fact.tags:
+                if tag not in tags:
+                    tags.append(tag)
+        
+        canonical[members[best]] = facts[best].model_copy(update={
+            "perspectives": perspectives,
+            "tags": tags,
+            "confidence": combined_confidence([fact.confidence for fact in facts])
+        })
+    
+    # Same perspectives and fact order as before, minus the merged duplicates
+    consolidated: Dict[str, List[ResearchFact]] = {}
+    index = 0
+    for perspective, facts in research_memory.items():
+        consolidated[perspective] = []
+        for _ in facts:
+            if index in canonical:
+                consolidated[perspective].append(canonical[index])
+            index += 1
+    
+    return consolidated
\ No newline at end of file
@@ -0,0 +1,103 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+from models.schemas import ResearchFact
+from tools.chunk_index import tokenize
+
+def section_query(section: Dict[str, Any]) -> str:
+    """Text describing an outline section: its title plus subsection titles."""
+    parts = [section.get("title", "")]
+    for subsection in section.get("subsections", []) or []:
+        if isinstance(subsection, dict):
+            parts.append(subsection.get("title", ""))
+        else:
+            parts.append(str(subsection))
+    return " ".join(parts)
+
+class FactIndex:
+    """TF-IDF index over research facts, used to route facts to outline sections."""
+    
+    def __init__(self, research_memory: Dict[str, List[ResearchFact]], dedupe: bool = True):
+        facts = [fact for facts in research_memory.values() for fact in facts]
+        
+        if dedupe:
+            # Keep the most confident copy of facts that say exactly the same thing
+            unique = {}
+            for fact in sorted(facts, key=lambda f: -f.confidence):
+                unique.setdefault(" ".join(fact.fact.lower().split()), fact)
+            facts = [fact for fact in facts if unique.get(" ".join(fact.fact.lower().split())) is fact]
+        
+        self.facts = facts
+        
+        documents = [
+            tokenize(f"{fact.fact} {' '.join(fact.tags)} {' '.join(fact.perspectives or [fact.perspective]).replace('_', ' ')}")
+            for fact in facts
+        ]
+        self._vocabulary = {}
+        for terms in documents:
+            for term in terms:
+                self._vocabulary.setdefault(term, len(self._vocabulary))
+        
+        counts = self._counts(documents)
+        document_frequency = (counts > 0).sum(axis=0)
+        self._idf = np.log((1 + len(facts)) / (1 + document_frequency)) + 1
+        self._matrix = self._normalize(self._weight(counts))
+    
+    def route(self, sections: List[Dict[str, Any]], top_k: int,
+              max_sections_per_fact: Optional[int] = None) -> List[List[ResearchFact]]:
+        """Pick up to top_k facts for every section from one similarity matrix.
+        
+        With max_sections_per_fact set, facts are handed out greedily by score so
+        the same fact is not repeated across more sections than that. Sections with
+        no matching facts get the most confident facts that are still available.
+        """
+        if not self.facts or not sections:
+            return [[] for _ in sections]
+        
+        routed: List[List[int]] = [[] for _ in sections]
+        queries = self._counts([tokenize(section_query(section)) for section in sections])
+        similarity = self._normalize(self._weight(queries)) @ self._matrix.T
+        
+        uses = np.zeros(len(self.facts), dtype=np.int32)
+        limit = max_sections_per_fact or len(sections)
+        
+        # Highest scoring (section, fact) pairs first across the whole matrix
+        for flat in np.argsort(-similarity, axis=None, kind="stable"):
+            s, f = divmod(int(flat), len(self.facts))
+            if similarity[s, f] <= 0:
+                break
+            if len(routed[s]) < top_k and uses[f] < limit:
+                routed[s].append(f)
+                uses[f] += 1
+        
+        by_confidence = sorted(range(len(self.facts)), key=lambda f: -self.facts[f].confidence)
+        for picked in routed:
+            if picked:
+                continue
+            for f in by_confidence:
+                if len(picked) >= top_k:
+                    break
+                if uses[f] < limit:
+                    picked.append(f)
+                    uses[f] += 1
+        
+        return [[self.facts[f] for f in picked] for picked in routed]
+    
+    def _counts(self, documents: List[List[str]]) -> np.ndarray:
+        """Term count matrix over the index vocabulary."""
+        counts = np.zeros((len(documents), len(self._vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(documents):
+            for term in terms:
+                column = self._vocabulary.get(term)
+                if column is not None:
+                    counts[row, column] += 1
+        return counts
+    
+    def _weight(self, counts: np.ndarray) -> np.ndarray:
+        """Sublinear TF-IDF weighting."""
+        return np.log1p(counts) * self._idf
+    
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """L2-normalize rows so dot products are cosine similarities."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
\ No newline at end of file
@@ -0,0 +1,207 @@
+import asyncio
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+import lxml.html
+from tools.chunker import iter_chunks
+from config import Config
+
+# Main content areas tried in order when trafilatura finds nothing
+CONTENT_XPATHS = [
+    '//article',
+    '//main',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " content ")]',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " main-content ")]',
+    '//*[@id="content"]',
+    '//*[@id="main-content"]',
+    '//div[@role="main"]'
+]
+
+# lxml refuses decoded text that still declares its encoding
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>', re.IGNORECASE)
+
+META_FIELDS = {
+    'description': ['description', 'og:description'],
+    'author': ['author', 'article:author'],
+    'published': ['article:published_time', 'date', 'pubdate'],
+    'site_name': ['og:site_name']
+}
+
+# How often an extraction waiting for a free worker checks again
+SLOT_POLL_INTERVAL = 0.01
+
+def chunk_settings() -> Dict[str, Any]:
+    """Chunking settings for extract_document, read from Config in the calling process.
+    
+    Spawned workers import a fresh Config, so runtime changes only reach them as arguments.
+    """
+    return {
+        'chunk_size': Config.CHUNK_SIZE,
+        'overlap': Config.CHUNK_OVERLAP,
+        'unit': Config.CHUNK_UNIT,
+        'boundary': Config.CHUNK_BOUNDARY
+    }
+
+def extract_document(html: str, chunking: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Parse a page once and extract its title, main content, metadata and chunks.
+    
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    try:
+        tree = parse_html(html)
+    except Exception as e:
+        print(f"HTML parsing failed: {e}")
+        return None
+    
+    title = (tree.findtext('.//title') or '').strip() or "No Title"
+    metadata = _extract_metadata(tree)
+    
+    content = None
+    try:
+        from trafilatura import extract
+        content = extract(tree)
+        metadata['method'] = 'trafilatura'
+    except ImportError:
+        print("Trafilatura not available, using lxml")
+    except Exception as e:
+        print(f"Trafilatura extraction failed: {e}")
+    
+    if not content:
+        content = _extract_main_text(tree)
+        metadata['method'] = 'lxml'
+    
+    chunks = list(iter_chunks(content, **(chunking or chunk_settings())))
+    
+    return {'title': title, 'content': content, 'chunks': chunks, 'metadata': metadata}
+
+def parse_html(html: str):
+    """Parse decoded HTML, accepting XHTML declarations and empty pages like BeautifulSoup did."""
+    html = XML_DECLARATION.sub('', html, count=1)
+    if not html.strip():
+        return lxml.html.fromstring('<html></html>')
+    return lxml.html.fromstring(html)
+
+def _extract_metadata(tree) -> Dict[str, str]:
+    """Collect common <meta> fields and the document language."""
+    meta = {}
+    for element in tree.iter('meta'):
+        name = (element.get('name') or element.get('property') or '').lower()
+        if name and element.get('content'):
+            meta.setdefault(name, element.get('content').strip())
+    
+    metadata = {}
+    for field, names in META_FIELDS.items():
+        for name in names:
+            if meta.get(name):
+                metadata[field] = meta[name]
+                break
+    
+    language = tree.get('lang')
+    if language:
+        metadata['language'] = language
+    
+    return metadata
+
+def _extract_main_text(tree) -> str:
+    """Fallback extraction from the main content area of the parsed tree."""
+    for element in tree.xpath('//script|//style|//nav|//footer'):
+        element.drop_tree()
+    
+    for xpath in CONTENT_XPATHS:
+        elements = tree.xpath(xpath)
+        if elements:
+            return elements[0].text_content().strip()
+    
+    body = tree.find('.//body')
+    return (body if body is not None else tree).text_content().strip()
+
+_pool: Optional[ProcessPoolExecutor] = None
+# One slot per worker: tasks are only submitted to an idle worker, so their timeout never counts queueing
+_slots: Optional[threading.Semaphore] = None
+_pool_lock = threading.Lock()
+
+def _pool_and_slots() -> Tuple[Optional[ProcessPoolExecutor], Optional[threading.Semaphore]]:
+    global _pool, _slots
+    
+    if Config.EXTRACTION_WORKERS <= 0:
+        return None, None
+    
+    with _pool_lock:
+        if _pool is None:
+            # spawn avoids forking a process that is already running threads
+            _pool = ProcessPoolExecutor(
+                max_workers=Config.EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _slots = threading.Semaphore(Config.EXTRACTION_WORKERS)
+        return _pool, _slots
+
+def get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared extraction process pool, or None to extract in-process."""
+    return _pool_and_slots()[0]
+
+def reset_extraction_pool(pool: Optional[ProcessPoolExecutor] = None, terminate: bool = False) -> None:
+    """Discard the pool so the next extraction starts a fresh one.
+    
+    Given a pool, only that pool is discarded, so callers reacting to the same
+    failure do not discard each other's replacement. terminate=True kills the
+    workers, which is the only way to stop a task that is already running.
+    """
+    global _pool, _slots
+    
+    with _pool_lock:
+        if _pool is None or (pool is not None and pool is not _pool):
+            return
+        if terminate:
+            # ProcessPoolExecutor has no public API for its worker processes
+            for process in list((getattr(_pool, "_processes", None) or {}).values()):
+                process.terminate()
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool, _slots = None, None
+
+def extract_in_pool(html: str, timeout: float) -> Optional[Dict[str, Any]]:
+    """Extract a page in the worker pool, blocking until it finishes.
+    
+    Raises concurrent.futures.TimeoutError after timeout seconds of extraction,
+    having killed the stuck worker, and BrokenProcessPool if the pool died
+    under the task (it is replaced for the next one).
+    """
+    pool, slots = _pool_and_slots()
+    if pool is None:
+        return extract_document(html)
+    
+    slots.acquire()
+    try:
+        future = pool.submit(extract_document, html, chunk_settings())
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        reset_extraction_pool(pool, terminate=True)
+        raise
+    except BrokenProcessPool:
+        reset_extraction_pool(pool)
+        raise
+    finally:
+        slots.release()
+
+async def aextract_in_pool(html: str, timeout: float) -> Optional[Dict[str, Any]]:
+    """Async version of extract_in_pool that never blocks the event loop."""
+    pool, slots = _pool_and_slots()
+    if pool is None:
+        return await asyncio.wait_for(asyncio.to_thread(extract_document, html), timeout=timeout)
+    
+    while not slots.acquire(blocking=False):
+        await asyncio.sleep(SLOT_POLL_INTERVAL)
+    try:
+        future = asyncio.wrap_future(pool.submit(extract_document, html, chunk_settings()))
+        return await asyncio.wait_for(future, timeout=timeout)
+    except TimeoutError:
+        reset_extraction_pool(pool, terminate=True)
+        raise
+    except BrokenProcessPool:
+        reset_extraction_pool(pool)
+        raise
+    finally:
+        slots.release()
\ No newline at end of file
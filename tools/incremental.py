@@ -0,0 +1,29 @@
+import hashlib
+from typing import Any, Dict, Iterable
+from models.schemas import ResearchFact, SourceContent
+from tools.urls import canonicalize_url
+
+def content_hash(text: str) -> str:
+    """Fingerprint of extracted page text that ignores whitespace-only changes."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+def source_hashes(sources: Iterable[SourceContent]) -> Dict[str, str]:
+    """Content hash of every source, keyed by canonical URL."""
+    return {canonicalize_url(source.url): content_hash(source.content) for source in sources}
+
+def fact_key(fact: ResearchFact) -> str:
+    """Stable identity of a fact: where it came from and what it says."""
+    text = " ".join(fact.fact.lower().split())
+    return hashlib.sha256(f"{canonicalize_url(fact.source_url)}\n{text}".encode("utf-8")).hexdigest()[:16]
+
+def previous_run(run_id: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    """What an incremental refresh needs from the final state of a completed run."""
+    return {
+        "run_id": run_id,
+        "source_hashes": source_hashes(values.get("source_contents") or []),
+        "research_memory": values.get("research_memory") or {},
+        "outline": values.get("outline"),
+        "section_facts": values.get("section_facts") or {},
+        "draft_sections": values.get("draft_sections") or {},
+        "final_article": values.get("final_article") or ""
+    }
\ No newline at end of file
@@ -0,0 +1,170 @@
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+from tools.llm_cache import get_llm_cache
+from tools.rate_limiter import RateLimiter, get_rate_limiter
+from tools.tokens import count_tokens
+from tools.token_budget import MESSAGE_OVERHEAD
+from config import Config
+
+# Newer OpenAI SDKs are built on httpx2; transports must come from the same library
+try:
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Prompt tokens plus the completion allowance of a chat completion request."""
+    try:
+        body = json.loads(request.content or b"{}")
+    except ValueError:
+        return 0
+    
+    prompt = sum(
+        count_tokens(str(message.get("content") or "")) + MESSAGE_OVERHEAD
+        for message in body.get("messages", [])
+    )
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or Config.RATE_LIMIT_COMPLETION_TOKENS
+    return prompt + completion
+
+class SlotStream(httpx.SyncByteStream):
+    """Response body that frees its rate limiter slot when closed."""
+    
+    def __init__(self, stream: httpx.SyncByteStream, limiter: RateLimiter):
+        self.stream = stream
+        self.limiter = limiter
+        self.freed = False
+    
+    def __iter__(self):
+        yield from self.stream
+    
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            if not self.freed:
+                self.freed = True
+                self.limiter.free()
+
+class AsyncSlotStream(httpx.AsyncByteStream):
+    """Async response body that frees its rate limiter slot when closed."""
+    
+    def __init__(self, stream: httpx.AsyncByteStream, limiter: RateLimiter):
+        self.stream = stream
+        self.limiter = limiter
+        self.freed = False
+    
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            yield chunk
+    
+    async def aclose(self):
+        try:
+            await self.stream.aclose()
+        finally:
+            if not self.freed:
+                self.freed = True
+                self.limiter.free()
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """HTTP transport that sends OpenAI requests through the shared rate limiter.
+    
+    A request holds its concurrency slot until its body is closed, so streamed
+    completions stay within the limit while tokens arrive.
+    """
+    
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self.transport = httpx.HTTPTransport()
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.limiter.send(
+            lambda: self.transport.handle_request(request),
+            estimate_request_tokens(request),
+            hold=True
+        )
+        response.stream = SlotStream(response.stream, self.limiter)
+        return response
+    
+    def close(self):
+        self.transport.close()
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Async HTTP transport that sends OpenAI requests through the shared rate limiter, holding slots like RateLimitedTransport."""
+    
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self.transport = httpx.AsyncHTTPTransport()
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.limiter.asend(
+            lambda: self.transport.handle_async_request(request),
+            estimate_request_tokens(request),
+            hold=True
+        )
+        response.stream = AsyncSlotStream(response.stream, self.limiter)
+        return response
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+_models: Dict[Tuple[str, float], BaseChatModel] = {}
+_models_lock = threading.Lock()
+_http_clients: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+
+def _rate_limited_clients() -> Dict[str, Any]:
+    """HTTP clients for ChatOpenAI that go through the OpenAI rate limiter, if enabled.
+    
+    Cache hits never reach the transport, so they do not count against the limits.
+    The limiter retries throttled requests itself, so the SDK's retries are turned off.
+    """
+    global _http_clients
+    
+    limiter = get_rate_limiter("openai")
+    if limiter is None:
+        return {}
+    
+    if _http_clients is None:
+        _http_clients = (
+            DefaultHttpxClient(transport=RateLimitedTransport(limiter)),
+            DefaultAsyncHttpxClient(transport=AsyncRateLimitedTransport(limiter))
+        )
+    return {"http_client": _http_clients[0], "http_async_client": _http_clients[1], "max_retries": 0}
+
+def openai_chat_model(temperature: float) -> ChatOpenAI:
+    """OpenAI chat model wired to the shared response cache and rate limiter."""
+    cache = get_llm_cache()
+    return ChatOpenAI(
+        model=Config.LLM_MODEL,
+        temperature=temperature,
+        cache=cache if cache is not None else False,
+        # Token usage of streamed responses, for run traces
+        stream_usage=True,
+        **_rate_limited_clients()
+    )
+
+# Chat model factories by name, selected with Config.LLM_PROVIDER; each takes the temperature
+_model_factories: Dict[str, Callable[[float], BaseChatModel]] = {"openai": openai_chat_model}
+
+def register_chat_model(name: str, factory: Callable[[float], BaseChatModel]):
+    """Make a chat model factory selectable with Config.LLM_PROVIDER."""
+    _model_factories[name] = factory
+
+def chat_model(temperature: float) -> BaseChatModel:
+    """Return the chat model used by graph nodes, from the configured provider.
+    
+    Models are shared per provider and temperature so nodes and runs reuse the
+    same client and its connection pool.
+    """
+    provider = Config.LLM_PROVIDER
+    if provider not in _model_factories:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    
+    with _models_lock:
+        key = (provider, temperature)
+        if key not in _models:
+            _models[key] = _model_factories[provider](temperature)
+        return _models[key]
\ No newline at end of file
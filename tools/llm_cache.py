@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from config import Config
+
+# Set for runs that must not be answered from the cache
+_bypass = ContextVar("llm_cache_bypass", default=False)
+
+class LLMResponseCache(BaseCache):
+    """Two-tier chat completion cache: an in-memory LRU in front of SQLite."""
+    
+    def __init__(self, db_path: str, ttl: float, max_entries: int, memory_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+    
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Return cached generations for a prompt, or None on a miss."""
+        if _bypass.get():
+            return None
+        
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        
+        with self._lock:
+            if key in self._memory:
+                generations, created_at = self._memory[key]
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    return self._as_hits(generations)
+                del self._memory[key]
+            
+            row = self._db.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        
+        if not row or now - row[1] >= self.ttl:
+            return None
+        
+        generations = self._deserialize(row[0])
+        self._remember(key, generations, row[1])
+        return self._as_hits(generations)
+    
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store generations in both tiers."""
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        self._remember(key, return_val, now)
+        
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                (key, self._serialize(return_val), now)
+            )
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+    
+    def clear(self, **kwargs) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+    
+    def _remember(self, key: str, generations: RETURN_VAL_TYPE, created_at: float) -> None:
+        """Put an entry in the memory tier, evicting the least recently used."""
+        with self._lock:
+            self._memory[key] = (generations, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+    
+    def _as_hits(self, generations: RETURN_VAL_TYPE) -> RETURN_VAL_TYPE:
+        """Copies of cached generations marked as cache hits, so tracing does not count their tokens."""
+        return [
+            ChatGeneration(message=gen.message.model_copy(
+                update={"response_metadata": {**gen.message.response_metadata, "cache_hit": True}}
+            ))
+            for gen in generations
+        ]
+    
+    def _key(self, prompt: str, llm_string: str) -> str:
+        """Key on the model configuration and the whitespace-normalized messages."""
+        try:
+            messages = [
+                (m["kwargs"].get("type"), m["kwargs"].get("content"))
+                for m in json.loads(prompt)
+            ]
+            normalized = json.dumps([
+                (role, " ".join(content.split()) if isinstance(content, str) else content)
+                for role, content in messages
+            ])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            normalized = " ".join(prompt.split())
+        
+        return hashlib.sha256(f"{llm_string}\x00{normalized}".encode("utf-8")).hexdigest()
+    
+    def _serialize(self, generations: RETURN_VAL_TYPE) -> str:
+        """Serialize chat generations to JSON."""
+        return json.dumps([gen.message.model_dump() for gen in generations])
+    
+    def _deserialize(self, value: str) -> RETURN_VAL_TYPE:
+        """Rebuild chat generations from JSON."""
+        return [ChatGeneration(message=AIMessage(**data)) for data in json.loads(value)]
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide response cache, or None when caching is disabled."""
+    global _cache
+    
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(
+                Config.LLM_CACHE_PATH,
+                Config.LLM_CACHE_TTL,
+                Config.LLM_CACHE_MAX_ENTRIES,
+                Config.LLM_CACHE_MEMORY_ENTRIES
+            )
+        return _cache
+
+@contextmanager
+def bypass_llm_cache(enabled: bool = True):
+    """Skip cache lookups inside the block; fresh responses still refresh the cache."""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
\ No newline at end of file
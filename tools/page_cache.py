@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from models.schemas import SourceContent
+
+class PageCache:
+    """Content-addressed on-disk cache of fetched pages and their extracted content."""
+    
+    def __init__(self, cache_dir: str, ttl: float, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS objects (
+                content_hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+    
+    @staticmethod
+    def content_hash(body: str) -> str:
+        """Hash a response body; identical pages share one cache object."""
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+    
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cache entry for a URL, if its object is still stored."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT p.content_hash, p.etag, p.last_modified, p.fetched_at "
+                "FROM pages p JOIN objects o ON o.content_hash = p.content_hash WHERE p.url = ?",
+                (url,)
+            ).fetchone()
+        
+        if not row:
+            return None
+        
+        return {"content_hash": row[0], "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+    
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Check whether an entry can be served without contacting the origin."""
+        return time.time() - entry["fetched_at"] < self.ttl
+    
+    def validators(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Build conditional request headers for revalidating an entry."""
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def load(self, url: str, content_hash: str) -> Optional[SourceContent]:
+        """Load extracted content for a body hash, re-addressed to the given URL."""
+        try:
+            with open(self._object_path(content_hash), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        with self._lock:
+            self._db.execute(
+                "UPDATE objects SET last_access = ? WHERE content_hash = ?",
+                (time.time(), content_hash)
+            )
+            self._db.commit()
+        
+        data["url"] = url
+        return SourceContent(**data)
+    
+    def store(self, url: str, content_hash: str, content: SourceContent,
+              etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Store extracted content and point the URL at it."""
+        path = self._object_path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        payload = json.dumps(content.model_dump())
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO objects (content_hash, size, last_access) VALUES (?, ?, ?)",
+                (content_hash, len(payload), now)
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, content_hash, etag, last_modified, now)
+            )
+            self._db.commit()
+            self._evict()
+    
+    def mark_revalidated(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Restart the TTL of an entry after a 304 Not Modified response."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET fetched_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), etag, last_modified, url)
+            )
+            self._db.commit()
+    
+    def _evict(self) -> None:
+        """Drop least recently used objects until the cache fits in max_bytes."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        rows = self._db.execute("SELECT content_hash, size FROM objects ORDER BY last_access").fetchall()
+        for content_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._object_path(content_hash))
+            except OSError:
+                pass
+            self._db.execute("DELETE FROM objects WHERE content_hash = ?", (content_hash,))
+            self._db.execute("DELETE FROM pages WHERE content_hash = ?", (content_hash,))
+            total -= size
+        
+        self._db.commit()
+    
+    def _object_path(self, content_hash: str) -> str:
+        """Path of the object file for a body hash."""
+        return os.path.join(self.cache_dir, "objects", content_hash[:2], f"{content_hash}.json")
\ No newline at end of file
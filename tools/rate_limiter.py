@@ -0,0 +1,272 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, TypeVar
+from tools.tracing import record
+from config import Config
+
+T = TypeVar("T")
+
+# Statuses that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUSES = (429, 503)
+
+# How often a request waiting for a concurrency slot checks again
+POLL_INTERVAL = 0.05
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait from Retry-After (or OpenAI's retry-after-ms), if the server sent one."""
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Bucket refilled continuously up to one minute's allowance."""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+    
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 when it can be taken now)."""
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+        # A single request larger than the bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.available) / self.rate)
+    
+    def take(self, amount: float):
+        self.available -= min(amount, self.capacity)
+
+class RateLimiter:
+    """Client-side limiter for one provider, shared across threads and event loops.
+    
+    Requests wait for a requests-per-minute bucket, an optional tokens-per-minute
+    bucket and a concurrency slot. Concurrency adapts AIMD-style: it grows by
+    about one slot per window of successful requests and halves when the
+    provider throttles, and Retry-After pauses every request to the provider.
+    """
+    
+    def __init__(self, name: str, rpm: float, tpm: Optional[float] = None,
+                 max_concurrency: int = 8, min_concurrency: int = 1, max_retries: int = 5):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.concurrency = float(max_concurrency)
+        
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        
+        self.completed = 0
+        self.throttled = 0
+        self.retries = 0
+    
+    def _try_acquire(self, tokens: int) -> float:
+        """Take a slot if one is free, otherwise return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._in_flight >= int(self.concurrency):
+                return POLL_INTERVAL
+            
+            wait = self._requests.wait_time(1, now)
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            
+            self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(tokens)
+            self._in_flight += 1
+            return 0.0
+    
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until the request may be sent; returns when it was admitted."""
+        with self._lock:
+            self._waiting += 1
+        try:
+            while True:
+                wait = self._try_acquire(tokens)
+                if wait <= 0:
+                    return time.monotonic()
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+    
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Wait without blocking the event loop until the request may be sent."""
+        with self._lock:
+            self._waiting += 1
+        try:
+            while True:
+                wait = self._try_acquire(tokens)
+                if wait <= 0:
+                    return time.monotonic()
+                await asyncio.sleep(wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+    
+    def release(self, started: float, status: Optional[int] = None,
+                headers: Optional[Mapping[str, str]] = None, free: bool = True) -> Optional[float]:
+        """Adapt to the response and free the slot (unless free=False); returns the backoff for a throttled request."""
+        with self._lock:
+            if free:
+                self._in_flight -= 1
+            
+            if status not in THROTTLE_STATUSES:
+                if status is not None:
+                    self.completed += 1
+                    self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+                return None
+            
+            self.throttled += 1
+            # Responses to requests sent before the last cut describe the old limit
+            if started >= self._last_decrease:
+                self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+                self._last_decrease = time.monotonic()
+            
+            retry_after = parse_retry_after(headers or {})
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            return retry_after
+    
+    def free(self):
+        """Free a slot kept by send(hold=True), once the response body has been consumed."""
+        with self._lock:
+            self._in_flight -= 1
+    
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before retrying, preferring the server's Retry-After."""
+        if retry_after is not None:
+            return retry_after
+        return min(60.0, 2 ** attempt) * random.uniform(0.5, 1.0)
+    
+    def send(self, request: Callable[[], T], tokens: int = 0, hold: bool = False) -> T:
+        """Send a blocking request, retrying while the provider throttles it.
+        
+        The request returns a requests or httpx response; the last response is
+        returned once retries run out. With hold=True the returned response
+        keeps its concurrency slot until the caller calls free(), so a body
+        streamed after the headers still counts against the limit.
+        """
+        attempt = 0
+        while True:
+            started = self.acquire(tokens)
+            try:
+                response = request()
+            except BaseException:
+                # Cancellation too, or the slot would never come back
+                self.release(started)
+                raise
+            
+            throttled = response.status_code in THROTTLE_STATUSES
+            final = not throttled or attempt >= self.max_retries
+            retry_after = self.release(started, response.status_code, response.headers, free=not (hold and final))
+            if throttled:
+                record("throttled")
+            if final:
+                return response
+            
+            response.close()
+            self.retries += 1
+            record("retries")
+            time.sleep(self.backoff(attempt, retry_after))
+            attempt += 1
+    
+    async def asend(self, request: Callable[[], Awaitable[T]], tokens: int = 0, hold: bool = False) -> T:
+        """Async version of send for httpx responses."""
+        attempt = 0
+        while True:
+            started = await self.aacquire(tokens)
+            try:
+                response = await request()
+            except BaseException:
+                # asyncio.CancelledError is not an Exception; a cancelled request must free its slot
+                self.release(started)
+                raise
+            
+            throttled = response.status_code in THROTTLE_STATUSES
+            final = not throttled or attempt >= self.max_retries
+            retry_after = self.release(started, response.status_code, response.headers, free=not (hold and final))
+            if throttled:
+                record("throttled")
+            if final:
+                return response
+            
+            await response.aclose()
+            self.retries += 1
+            record("retries")
+            await asyncio.sleep(self.backoff(attempt, retry_after))
+            attempt += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current limits and load, for tuning throughput."""
+        with self._lock:
+            return {
+                "provider": self.name,
+                "concurrency": round(self.concurrency, 2),
+                "in_flight": self._in_flight,
+                "queued": self._waiting,
+                "completed": self.completed,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "paused_for": round(max(0.0, self._blocked_until - time.monotonic()), 2)
+            }
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str) -> Optional[RateLimiter]:
+    """Return the process-wide limiter for a provider, or None when it is not limited."""
+    settings = Config.RATE_LIMITS.get(provider)
+    if not Config.RATE_LIMIT_ENABLED or not settings:
+        return None
+    
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(
+                provider,
+                rpm=settings["rpm"],
+                tpm=settings.get("tpm"),
+                max_concurrency=settings["max_concurrency"],
+                min_concurrency=settings.get("min_concurrency", 1),
+                max_retries=Config.RATE_LIMIT_MAX_RETRIES
+            )
+        return _limiters[provider]
+
+def rate_limit_stats() -> List[Dict[str, Any]]:
+    """Stats of every limiter created so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.stats() for limiter in limiters]
+
+def format_rate_limit_stats() -> str:
+    """One line per provider with its current limit, load and throttling."""
+    return "\n".join(
+        f" Rate limit [{s['provider']}]: concurrency {s['concurrency']} "
+        f"({s['in_flight']} in flight, {s['queued']} queued), "
+        f"{s['completed']} ok, {s['throttled']} throttled, {s['retries']} retried"
+        for s in rate_limit_stats()
+    )
\ No newline at end of file
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+from models.schemas import SearchResult
+from tools.tracing import record
+from config import Config
+
+def normalize_query(query: str) -> str:
+    """Normalize case and whitespace, and ignore word order in the generated suffix."""
+    tokens = query.lower().split()
+    suffix_terms = set(Config.SEARCH_QUERY_SUFFIX.lower().split())
+    
+    # Peel the generated suffix off the end so its word order does not matter
+    split = len(tokens)
+    while split > 0 and tokens[split - 1] in suffix_terms:
+        split -= 1
+    
+    return " ".join(tokens[:split] + sorted(tokens[split:]))
+
+class SearchCache:
+    """Process-wide search result cache with TTL and stale-while-revalidate."""
+    
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[List[SearchResult], float]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(query: str, provider: str, max_results: int) -> Tuple:
+        """Build the cache key for a search."""
+        return (provider, max_results, normalize_query(query))
+    
+    def get_or_fetch(self, key: Tuple, fetch: Callable[[], List[SearchResult]]) -> List[SearchResult]:
+        """Serve fresh entries, serve stale ones while refreshing, and fetch on a miss."""
+        now = time.time()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                results, fetched_at = entry
+                age = now - fetched_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    record("search_cache_hit")
+                    return list(results)
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                    record("search_cache_stale")
+                    return list(results)
+        
+        record("search_cache_miss")
+        results = fetch()
+        self._store(key, results)
+        return results
+    
+    def _refresh(self, key: Tuple, fetch: Callable[[], List[SearchResult]]) -> None:
+        """Refetch a stale entry in the background."""
+        try:
+            self._store(key, fetch())
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+    
+    def _store(self, key: Tuple, results: List[SearchResult]) -> None:
+        """Remember non-empty results; failed searches are never cached."""
+        if not results:
+            return
+        
+        with self._lock:
+            self._entries[key] = (list(results), time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Return the process-wide search cache, or None when caching is disabled."""
+    global _cache
+    
+    if not Config.SEARCH_CACHE_ENABLED:
+        return None
+    
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache(
+                Config.SEARCH_CACHE_TTL,
+                Config.SEARCH_CACHE_STALE_TTL,
+                Config.SEARCH_CACHE_MAX_ENTRIES
+            )
+        return _cache
\ No newline at end of file
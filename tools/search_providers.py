@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Type
+from models.schemas import SearchResult
+from tools.clients import get_http_session
+from tools.rate_limiter import get_rate_limiter
+from tools.search_cache import normalize_query
+from tools.tracing import record
+from config import Config
+
+class SearchProvider(ABC):
+    """A web search backend. Subclasses implement _search and raise on failure."""
+    
+    name = ""
+    
+    def __init__(self):
+        self.api_key = os.getenv(f"{self.name.upper()}_API_KEY")
+        self.session = get_http_session()
+        self.limiter = get_rate_limiter(self.name)
+    
+    def search(self, query: str, max_results: int) -> List[SearchResult]:
+        record("search_requests")
+        return self._search(query, max_results)
+    
+    @abstractmethod
+    def _search(self, query: str, max_results: int) -> List[SearchResult]:
+        """Run the query against the backend; errors propagate to SearchTool."""
+    
+    def _send(self, request: Callable[[], Any]):
+        """Send a request through the provider's rate limiter, if it has one."""
+        response = self.limiter.send(request) if self.limiter else request()
+        response.raise_for_status()
+        return response
+
+_providers: Dict[str, Type[SearchProvider]] = {}
+
+def register_provider(cls: Type[SearchProvider]) -> Type[SearchProvider]:
+    """Class decorator adding a provider to the registry under its name."""
+    if getattr(cls, "__abstractmethods__", None):
+        raise TypeError(f"Search provider {cls.__name__} does not implement {', '.join(sorted(cls.__abstractmethods__))}")
+    _providers[cls.name] = cls
+    return cls
+
+def get_search_provider(name: str) -> SearchProvider:
+    """Create the registered provider called name."""
+    if name not in _providers:
+        raise ValueError(f"Unsupported search provider: {name}")
+    return _providers[name]()
+
+def search_providers() -> List[str]:
+    return sorted(_providers)
+
+@register_provider
+class TavilyProvider(SearchProvider):
+    """Search using Tavily API."""
+    
+    name = "tavily"
+    url = "https://api.tavily.com/search"
+    
+    def _search(self, query: str, max_results: int) -> List[SearchResult]:
+        payload = {
+            "api_key": self.api_key,
+            "query": query,
+            "max_results": max_results,
+            "include_answer": False,
+            "include_raw_content": False
+        }
+        data = self._send(lambda: self.session.post(self.url, json=payload)).json()
+        
+        return [
+            SearchResult(
+                url=result["url"],
+                title=result["title"],
+                content=result["content"],
+                relevance_score=result.get("score", 0.5)
+            )
+            for result in data.get("results", [])
+        ]
+
+@register_provider
+class SerpAPIProvider(SearchProvider):
+    """Search Google through SerpAPI."""
+    
+    name = "serpapi"
+    url = "https://serpapi.com/search.json"
+    
+    def _search(self, query: str, max_results: int) -> List[SearchResult]:
+        params = {
+            "engine": "google",
+            "q": query,
+            "num": max_results,
+            "api_key": self.api_key
+        }
+        data = self._send(lambda: self.session.get(self.url, params=params)).json()
+        
+        organic = [result for result in data.get("organic_results", []) if result.get("link")][:max_results]
+        # SerpAPI ranks results without scoring them, so the score falls with position
+        return [
+            SearchResult(
+                url=result["link"],
+                title=result.get("title", ""),
+                content=result.get("snippet", ""),
+                relevance_score=round(1.0 - rank / max(len(organic), 1), 4)
+            )
+            for rank, result in enumerate(organic)
+        ]
+
+@register_provider
+class FixtureProvider(SearchProvider):
+    """Canned results from a JSON file (Config.SEARCH_FIXTURE_PATH), for offline runs and tests.
+    
+    The file holds {"default": [...], "queries": {query: [...]}, "latency": seconds};
+    results are SearchResult fields and queries are matched after normalization.
+    """
+    
+    name = "fixture"
+    
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        path = path or Config.SEARCH_FIXTURE_PATH
+        if not path:
+            raise ValueError("The fixture search provider needs Config.SEARCH_FIXTURE_PATH")
+        
+        with open(path, encoding="utf-8") as f:
+            fixture = json.load(f)
+        self.latency = fixture.get("latency", 0.0)
+        self.default = [SearchResult(**result) for result in fixture.get("default", [])]
+        self.queries = {
+            normalize_query(query): [SearchResult(**result) for result in results]
+            for query, results in fixture.get("queries", {}).items()
+        }
+    
+    def _search(self, query: str, max_results: int) -> List[SearchResult]:
+        if self.latency:
+            time.sleep(self.latency)
+        return list(self.queries.get(normalize_query(query), self.default)[:max_results])
\ No newline at end of file
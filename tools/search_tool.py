@@ -1,51 +1,154 @@
-import os
-import requests
-from typing import List, Dict, Any
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import List, Dict, Any, Optional
 from models.schemas import SearchResult
+from tools.search_cache import get_search_cache
+from tools.search_providers import SearchProvider, get_search_provider
+from tools.tracing import record
+from tools.urls import canonicalize_url
+from config import Config
+
+def reciprocal_rank_fusion(result_lists: List[List[SearchResult]], k: int = 60,
+                           limit: Optional[int] = None) -> List[SearchResult]:
+    """Merge ranked result lists by reciprocal rank fusion, one result per canonical URL.
+    
+    A result scores sum(1 / (k + rank)) over the lists it appears in, so pages
+    several queries agree on rise to the top. Each URL keeps the result from
+    its best-ranked appearance.
+    """
+    scores: Dict[str, float] = {}
+    best: Dict[str, tuple] = {}
+    
+    for results in result_lists:
+        seen = set()
+        for rank, result in enumerate(results, 1):
+            url = canonicalize_url(result.url)
+            # A list that repeats a page only counts it once
+            if url in seen:
+                continue
+            seen.add(url)
+            scores[url] = scores.get(url, 0.0) + 1.0 / (k + rank)
+            if url not in best or rank < best[url][0]:
+                best[url] = (rank, result)
+    
+    fused = sorted(scores, key=lambda url: -scores[url])
+    return [best[url][1] for url in fused[:limit]]
+
+class LatencyTracker:
+    """Recent request latencies of one provider."""
+    
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+    
+    def add(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+    
+    def percentile(self, percentile: float) -> Optional[float]:
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        # Nearest-rank percentile
+        rank = max(1, math.ceil(percentile / 100 * len(samples)))
+        return samples[rank - 1]
+    
+    def __len__(self) -> int:
+        return len(self.samples)
+
+_latencies: Dict[str, LatencyTracker] = {}
+_latencies_lock = threading.Lock()
+
+def get_latency_tracker(provider: str) -> LatencyTracker:
+    with _latencies_lock:
+        return _latencies.setdefault(provider, LatencyTracker())
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=Config.SEARCH_HEDGE_WORKERS,
+                                             thread_name_prefix="search-hedge")
+        return _hedge_pool
 
 class SearchTool:
     """Tool for performing web searches."""
     
-    def __init__(self, provider: str = "tavily"):
-        self.provider = provider
-        self.api_key = os.getenv(f"{provider.upper()}_API_KEY")
+    def __init__(self, provider: str = "tavily", hedge_provider: Optional[str] = None):
+        self.provider = get_search_provider(provider)
+        self.hedge = get_search_provider(hedge_provider) if hedge_provider and hedge_provider != provider else None
+        self.cache = get_search_cache()
     
     def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
-        """Perform web search using the configured provider."""
-        if self.provider == "tavily":
-            return self._search_tavily(query, max_results)
-        elif self.provider == "serpapi":
-            return self._search_serpapi(query, max_results)
-        else:
-            raise ValueError(f"Unsupported search provider: {self.provider}")
-    
-    def _search_tavily(self, query: str, max_results: int) -> List[SearchResult]:
-        """Search using Tavily API."""
-        url = "https://api.tavily.com/search"
-        payload = {
-            "api_key": self.api_key,
-            "query": query,
-            "max_results": max_results,
-            "include_answer": False,
-            "include_raw_content": False
-        }
+        """Perform web search, answering repeat queries from the shared cache."""
+        if not self.cache:
+            return self._search_provider(query, max_results)
         
+        key = self.cache.key(query, self.provider.name, max_results)
+        return self.cache.get_or_fetch(key, lambda: self._search_provider(query, max_results))
+    
+    def _search_provider(self, query: str, max_results: int) -> List[SearchResult]:
+        """Perform web search using the configured provider, hedged if a secondary is set."""
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            for result in data.get("results", []):
-                results.append(SearchResult(
-                    url=result["url"],
-                    title=result["title"],
-                    content=result["content"],
-                    relevance_score=result.get("score", 0.5)
-                ))
-            
-            return results
-            
+            if self.hedge:
+                return self._search_hedged(query, max_results)
+            return self._timed(self.provider, query, max_results)
         except Exception as e:
-            print(f"Tavily search error: {e}")
+            print(f"{self.provider.name} search error: {e}")
             return []
+    
+    def _timed(self, provider: SearchProvider, query: str, max_results: int) -> List[SearchResult]:
+        """Search one provider, recording how long it took to answer."""
+        start = time.monotonic()
+        try:
+            return provider.search(query, max_results)
+        finally:
+            get_latency_tracker(provider.name).add(time.monotonic() - start)
+    
+    def hedge_delay(self) -> float:
+        """How long the primary gets before the secondary is asked too."""
+        latencies = get_latency_tracker(self.provider.name)
+        if len(latencies) < Config.SEARCH_HEDGE_MIN_SAMPLES:
+            return Config.SEARCH_HEDGE_DEFAULT_DELAY
+        return max(Config.SEARCH_HEDGE_MIN_DELAY, latencies.percentile(Config.SEARCH_HEDGE_PERCENTILE))
+    
+    def _search_hedged(self, query: str, max_results: int) -> List[SearchResult]:
+        """Ask the primary; if it is slower than usual or fails, ask the secondary as well.
+        
+        Whichever answers first with results wins. The loser is left to finish in
+        the background (a blocking request cannot be cancelled), which still
+        records its latency for the percentile.
+        """
+        pool = _get_hedge_pool()
+        # Copied contexts keep the run's trace for the providers' metrics
+        primary = pool.submit(contextvars.copy_context().run, self._timed, self.provider, query, max_results)
+        
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done and not primary.exception() and primary.result():
+            return primary.result()
+        
+        record("search_hedged")
+        secondary = pool.submit(contextvars.copy_context().run, self._timed, self.hedge, query, max_results)
+        errors = []
+        for future in as_completed([primary, secondary]):
+            try:
+                results = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            if results:
+                if future is secondary:
+                    record("search_hedge_wins")
+                return results
+        
+        if len(errors) == 2:
+            raise errors[0]
+        return []
@@ -0,0 +1,71 @@
+import hashlib
+from typing import List, Tuple
+import numpy as np
+from models.schemas import SourceContent
+
+# Shingle hashes are rolled modulo a Mersenne prime; products of 31-bit values fit in uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_BASE = np.uint64(1_000_003)
+
+def _word_hash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=4).digest(), "big") % int(_PRIME)
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """Hashes of the overlapping word n-grams of the lowercased text.
+    
+    Each distinct word is hashed once and the n-gram hashes are rolled up in
+    numpy, so long pages cost little more than splitting their text.
+    """
+    words = text.lower().split()
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    
+    vocabulary = {word: _word_hash(word) for word in set(words)}
+    codes = np.fromiter((vocabulary[word] for word in words), dtype=np.uint64, count=len(words))
+    
+    count = max(1, len(codes) - size + 1)
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(min(size, len(codes))):
+        hashes = (hashes * _BASE + codes[offset:offset + count]) % _PRIME
+    return hashes
+
+def signature(hashes: np.ndarray, size: int = 128) -> np.ndarray:
+    """Bottom-k MinHash signature: the size smallest distinct shingle hashes."""
+    return np.unique(hashes)[:size]
+
+def similarity(a: np.ndarray, b: np.ndarray, size: int = 128) -> float:
+    """Jaccard similarity estimated from two bottom-k signatures."""
+    union = np.union1d(a, b)[:size]
+    if not len(union):
+        return 0.0
+    # Of the smallest hashes of the union, the share that both sets contain
+    return len(np.intersect1d(np.intersect1d(a, b, assume_unique=True), union, assume_unique=True)) / len(union)
+
+def find_duplicate_sources(sources: List[SourceContent], threshold: float = 0.8, shingle_size: int = 5,
+                           signature_size: int = 128) -> List[Tuple[int, int]]:
+    """Pairs (duplicate, original) of sources whose text is near-identical.
+    
+    Sources are taken in order, so the earlier (higher-ranked) copy is the
+    original that a duplicate is folded into. A run retrieves a handful of
+    sources, so signatures are compared pairwise.
+    """
+    signatures = [
+        signature(shingle_hashes(source.content, shingle_size), signature_size)
+        for source in sources
+    ]
+    
+    originals: List[int] = []
+    duplicates: List[Tuple[int, int]] = []
+    for i, current in enumerate(signatures):
+        if not len(current):
+            continue
+        
+        original = next(
+            (j for j in originals if similarity(current, signatures[j], signature_size) >= threshold), None
+        )
+        if original is None:
+            originals.append(i)
+        else:
+            duplicates.append((i, original))
+    
+    return duplicates
\ No newline at end of file
@@ -0,0 +1,75 @@
+from typing import List, Optional, Sequence
+from langchain_core.messages import BaseMessage
+from tools.tokens import count_tokens, truncate_tokens
+from config import Config
+
+# Per-message framing tokens added by the chat format
+MESSAGE_OVERHEAD = 4
+
+def count_message_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Count the prompt tokens of a chat message list locally."""
+    return sum(count_tokens(str(m.content)) + MESSAGE_OVERHEAD for m in messages) + 2
+
+class TokenBudget:
+    """Prompt token budget for one node, with predictable trimming of context."""
+    
+    def __init__(self, node: str):
+        self.node = node
+        self.limit = Config.TOKEN_BUDGETS[node]
+    
+    def available(self, fixed_tokens: int) -> int:
+        """Tokens left for context once the fixed part of the prompt is counted."""
+        return max(0, self.limit - fixed_tokens)
+    
+    def fit(self, items: List[str], fixed_tokens: int,
+            priority: Optional[List[float]] = None) -> List[int]:
+        """Indices of the items to keep, in their original order.
+        
+        Items are admitted from highest to lowest priority (earlier items first when
+        no priority is given) and skipped when they no longer fit.
+        """
+        order = list(range(len(items)))
+        if priority is not None:
+            order.sort(key=lambda i: -priority[i])
+        
+        remaining = self.available(fixed_tokens)
+        kept = []
+        for i in order:
+            tokens = count_tokens(items[i]) + 1
+            if tokens <= remaining:
+                kept.append(i)
+                remaining -= tokens
+        
+        if len(kept) < len(items):
+            print(f" {self.node}: kept {len(kept)}/{len(items)} context items within {self.limit} tokens")
+        
+        return sorted(kept)
+    
+    def share(self, texts: List[str], fixed_tokens: int) -> List[str]:
+        """Trim texts so their total fits, giving each an equal share.
+        
+        Texts shorter than their share are kept whole and the tokens they leave
+        unused are split between the longer ones.
+        """
+        sizes = [count_tokens(text) for text in texts]
+        remaining = self.available(fixed_tokens)
+        if sum(sizes) <= remaining:
+            return list(texts)
+        
+        allowance = [0] * len(texts)
+        pending = sorted(range(len(texts)), key=lambda i: sizes[i])
+        while pending:
+            equal_share = remaining // len(pending)
+            i = pending.pop(0)
+            allowance[i] = min(sizes[i], equal_share)
+            remaining -= allowance[i]
+        
+        print(f" {self.node}: trimmed {len(texts)} context blocks to fit {self.limit} tokens")
+        return [
+            text if allowance[i] >= sizes[i] else truncate_tokens(text, allowance[i])
+            for i, text in enumerate(texts)
+        ]
+    
+    def exceeded(self, messages: Sequence[BaseMessage]) -> bool:
+        """Check a final prompt against the budget."""
+        return count_message_tokens(messages) > self.limit
\ No newline at end of file
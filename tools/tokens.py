@@ -0,0 +1,59 @@
+import os
+from functools import lru_cache
+from config import Config
+
+# Characters per token assumed when counts are estimated rather than tokenized
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """Load the tokenizer for the configured model, or None to estimate token counts.
+    
+    tiktoken downloads an encoding's BPE file the first time it is used; it is
+    kept in Config.TOKENIZER_CACHE_DIR so later loads, offline ones included,
+    read it from disk. load_tokenizer() runs this at startup, off the event loop.
+    """
+    estimate = f"estimating token counts at ~{CHARS_PER_TOKEN} characters per token"
+    if Config.TOKENIZER != "tiktoken":
+        print(f" Tokenizer set to {Config.TOKENIZER!r}, {estimate}")
+        return None
+    
+    try:
+        import tiktoken
+    except ImportError:
+        print(f" tiktoken is not installed, {estimate}")
+        return None
+    
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", Config.TOKENIZER_CACHE_DIR)
+    try:
+        return tiktoken.encoding_for_model(Config.LLM_MODEL)
+    except Exception as e:
+        print(f" Could not load the tiktoken encoding for {Config.LLM_MODEL} ({e}), {estimate}")
+        return None
+
+def load_tokenizer() -> bool:
+    """Load the tokenizer now; returns whether token counts are exact."""
+    return _encoding() is not None
+
+def count_tokens(text: str) -> int:
+    """Count tokens locally, falling back to a ~4 characters per token estimate."""
+    if not text:
+        return 0
+    
+    encoding = _encoding()
+    if encoding is None:
+        return max(1, len(text) // CHARS_PER_TOKEN)
+    
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most max_tokens tokens."""
+    if max_tokens <= 0:
+        return ""
+    
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
\ No newline at end of file
@@ -0,0 +1,321 @@
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from config import Config
+
+# The trace of the run in progress and the graph node currently executing
+_trace: ContextVar[Optional["RunTrace"]] = ContextVar("run_trace", default=None)
+_node: ContextVar[Optional[str]] = ContextVar("trace_node", default=None)
+
+# Upper bounds (seconds) of the node and run duration histograms
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+class RunTrace:
+    """Per-node spans and counters of one research run."""
+    
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.started = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.metrics: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+    
+    def add(self, node: Optional[str], metric: str, value: float = 1):
+        """Add to a counter of a node ("graph" for work outside any node)."""
+        with self._lock:
+            counters = self.metrics.setdefault(node or "graph", {})
+            counters[metric] = counters.get(metric, 0) + value
+    
+    def add_span(self, node: str, started: float, duration: float, error: Optional[str] = None):
+        with self._lock:
+            self.spans.append({
+                "node": node,
+                "start": round(started - self.started, 4),
+                "duration": round(duration, 4),
+                "error": error
+            })
+    
+    def finish(self, error: Optional[str] = None):
+        self.duration = time.time() - self.started
+        self.error = error
+    
+    def totals(self) -> Dict[str, float]:
+        """Every counter summed over all nodes."""
+        with self._lock:
+            totals: Dict[str, float] = {}
+            for counters in self.metrics.values():
+                for metric, value in counters.items():
+                    totals[metric] = totals.get(metric, 0) + value
+            return totals
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The trace as plain data, attached to the run's result."""
+        with self._lock:
+            spans = [dict(span) for span in self.spans]
+            metrics = {node: dict(counters) for node, counters in self.metrics.items()}
+        
+        return {
+            "run_id": self.run_id,
+            "duration": round(self.duration if self.duration is not None else time.time() - self.started, 4),
+            "error": self.error,
+            "spans": spans,
+            "metrics": metrics,
+            "totals": self.totals()
+        }
+
+def record(metric: str, value: float = 1):
+    """Count something against the current run and node; a no-op outside a traced run."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(_node.get(), metric, value)
+
+def start_trace(run_id: str) -> Optional[RunTrace]:
+    """A new trace for a run, or None when tracing is disabled."""
+    return RunTrace(run_id) if Config.TRACING_ENABLED else None
+
+@contextmanager
+def active_trace(trace: Optional[RunTrace]) -> Iterator[None]:
+    """Record into trace everything the block runs, including graph node tasks it starts."""
+    if trace is None:
+        yield
+        return
+    
+    token = _trace.set(trace)
+    try:
+        yield
+    finally:
+        _trace.reset(token)
+
+def traced_node(name: str, node: Callable) -> Callable:
+    """Wrap a graph node so its wall time and counters are recorded under its name."""
+    
+    def start() -> Tuple[Optional[RunTrace], Any, float]:
+        return _trace.get(), _node.set(name), time.time()
+    
+    def finish(trace: Optional[RunTrace], token, started: float, error: Optional[BaseException]):
+        _node.reset(token)
+        if trace is not None:
+            trace.add_span(name, started, time.time() - started, str(error) if error else None)
+    
+    if inspect.iscoroutinefunction(node) or inspect.iscoroutinefunction(getattr(node, "__call__", None)):
+        async def traced(state):
+            trace, token, started = start()
+            try:
+                result = await node(state)
+            except BaseException as e:
+                finish(trace, token, started, e)
+                raise
+            finish(trace, token, started, None)
+            return result
+    else:
+        def traced(state):
+            trace, token, started = start()
+            try:
+                result = node(state)
+            except BaseException as e:
+                finish(trace, token, started, e)
+                raise
+            finish(trace, token, started, None)
+            return result
+    
+    return traced
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """Records LLM calls, latency and token usage of a run into its trace.
+    
+    Passed in the graph config, so every chat model call made inside a node
+    reports here with the node name in its metadata.
+    """
+    
+    # Counting is cheap and thread-safe, so it runs inline rather than in an executor
+    run_inline = True
+    
+    def __init__(self, trace: RunTrace):
+        self.trace = trace
+        self._calls: Dict[UUID, Tuple[Optional[str], float]] = {}
+    
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs):
+        self._calls[run_id] = ((metadata or {}).get("langgraph_node"), time.time())
+    
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        node, started = self._calls.pop(run_id, (None, time.time()))
+        self.trace.add(node, "llm_calls")
+        self.trace.add(node, "llm_seconds", time.time() - started)
+        
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is None:
+                    continue
+                # Cached responses keep the original usage but cost nothing
+                if message.response_metadata.get("cache_hit"):
+                    self.trace.add(node, "llm_cache_hits")
+                    continue
+                usage = getattr(message, "usage_metadata", None) or {}
+                self.trace.add(node, "prompt_tokens", usage.get("input_tokens", 0))
+                self.trace.add(node, "completion_tokens", usage.get("output_tokens", 0))
+    
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        node, _ = self._calls.pop(run_id, (None, 0.0))
+        self.trace.add(node, "llm_errors")
+
+def format_trace(trace: RunTrace) -> str:
+    """One line of node timings and one of run totals, for the console."""
+    durations: Dict[str, float] = {}
+    for span in trace.to_dict()["spans"]:
+        durations[span["node"]] = durations.get(span["node"], 0) + span["duration"]
+    totals = trace.totals()
+    
+    timings = ", ".join(f"{node} {seconds:.2f}s" for node, seconds in durations.items())
+    return (
+        f" Trace: {timings}\n"
+        f" Trace totals: {int(totals.get('llm_calls', 0))} LLM calls "
+        f"({int(totals.get('llm_cache_hits', 0))} cached), "
+        f"{int(totals.get('prompt_tokens', 0))} prompt / {int(totals.get('completion_tokens', 0))} completion tokens, "
+        f"{int(totals.get('bytes_fetched', 0))} bytes fetched, {int(totals.get('retries', 0))} retries"
+    )
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+class MetricsRegistry:
+    """Process-wide metrics accumulated from finished run traces, in Prometheus text format.
+    
+    Trace counters become autoresearch_<counter>_total{node=...}; node and run
+    wall times are histograms.
+    """
+    
+    def __init__(self, prefix: str = "autoresearch"):
+        self.prefix = prefix
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple], List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, trace: RunTrace):
+        """Fold a finished run into the process totals."""
+        data = trace.to_dict()
+        with self._lock:
+            status = "failure" if data["error"] else "success"
+            self._inc("runs_total", (("status", status),))
+            self._observe("run_duration_seconds", (), data["duration"])
+            
+            for span in data["spans"]:
+                labels = (("node", span["node"]),)
+                self._observe("node_duration_seconds", labels, span["duration"])
+                if span["error"]:
+                    self._inc("node_errors_total", labels)
+            
+            for node, counters in data["metrics"].items():
+                for metric, value in counters.items():
+                    self._inc(f"{metric}_total", (("node", node),), value)
+    
+    def _inc(self, name: str, labels: Tuple, value: float = 1):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+    
+    def _observe(self, name: str, labels: Tuple, value: float):
+        # Per-bucket counts, then sum and count
+        key = (name, labels)
+        values = self._histograms.setdefault(key, [0.0] * (len(DURATION_BUCKETS) + 2))
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                values[i] += 1
+        values[-2] += value
+        values[-1] += 1
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+        
+        for (name, labels), values in histograms:
+            metric = f"{self.prefix}_{name}"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            for bound, count in zip(DURATION_BUCKETS, values):
+                lines.append(f"{metric}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {count:g}")
+            lines.append(f"{metric}_bucket{_format_labels(labels + (('le', '+Inf'),))} {values[-1]:g}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {values[-2]:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {values[-1]:g}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path: str):
+        """Atomically replace the metrics file (usable by a textfile collector)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+_registry = MetricsRegistry()
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+def export_trace(trace: RunTrace):
+    """Add a finished run to the process metrics and rewrite the metrics file."""
+    _registry.observe(trace)
+    if not Config.METRICS_PATH:
+        return
+    
+    try:
+        _registry.write(Config.METRICS_PATH)
+    except OSError as e:
+        print(f"Error writing metrics to {Config.METRICS_PATH}: {e}")
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = _registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics for Prometheus to scrape from a background thread (started once)."""
+    global _server
+    
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+            print(f" Serving metrics on http://{host}:{_server.server_port}/metrics")
+        return _server
\ No newline at end of file
@@ -0,0 +1,39 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "spm", "_ga", "_hsenc", "_hsmi"
+})
+
+def canonicalize_url(url: str) -> str:
+    """Canonical form of a URL, so the same page found twice compares equal.
+    
+    Lowercases the host, treats http as https, drops "www.", default ports,
+    fragments and tracking parameters, sorts the remaining query and trims
+    trailing slashes.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    
+    scheme = parts.scheme.lower() or "http"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    
+    if (scheme, port) in (("http", 80), ("https", 443)):
+        port = None
+    netloc = f"{host}:{port}" if port else host
+    
+    path = parts.path.rstrip("/") or "/"
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    
+    # http and https serve the same page for nearly every site we retrieve
+    return urlunsplit(("https" if scheme == "http" else scheme, netloc, path, urlencode(query), ""))
\ No newline at end of file
@@ -1,113 +1,251 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Optional
+import asyncio
+import threading
+import httpx
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
 from models.schemas import SourceContent
+from tools.page_cache import PageCache
+from tools.clients import get_http_session
+from tools.tracing import record
+from tools.html_extractor import aextract_in_pool, extract_in_pool
+from config import Config
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 
 class WebScraper:
     """Tool for scraping and parsing web content."""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = get_http_session()
+        self.cache = None
+        if Config.PAGE_CACHE_ENABLED:
+            self.cache = PageCache(Config.PAGE_CACHE_DIR, Config.PAGE_CACHE_TTL, Config.PAGE_CACHE_MAX_BYTES)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client_lock = threading.Lock()
+        self._fetch_limit: Optional[asyncio.Semaphore] = None
     
-    def scrape_url(self, url: str) -> Optional[SourceContent]:
-        """Scrape and parse content from a URL."""
+    def scrape_url(self, url: str, revalidate: bool = False) -> Optional[SourceContent]:
+        """Scrape and parse content from a URL.
+        
+        With revalidate=True, cached pages are checked with the server even while fresh.
+        """
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-
-            content = self._extract_with_trafilatura(response.text, url)
-            if not content:
-                content = self._extract_with_bs4(response.text, url)
+            entry, cached = self._from_cache(url, revalidate)
+            if cached:
+                return cached
             
-            return content
+            response = self._get(url, self.cache.validators(entry) if self.cache else {})
+            reused = self._reuse_response(url, response.status_code, response.text, response.headers, entry)
+            if not reused and response.status_code == 304:
+                # The cached object was evicted since the lookup, so fetch the page in full
+                response = self._get(url, {})
+                reused = self._reuse_response(url, response.status_code, response.text, response.headers, None)
+            if reused:
+                return reused
+            
+            content = self._extract(response.text, url)
+            return self._finish_response(url, response.text, response.headers, content)
             
         except Exception as e:
             print(f"Error scraping {url}: {e}")
             return None
     
-    def _extract_with_trafilatura(self, html: str, url: str) -> Optional[SourceContent]:
-        """Extract content using trafilatura."""
+    def create_async_client(self) -> httpx.AsyncClient:
+        """Create a pooled async HTTP client sized for concurrent retrieval."""
+        limits = httpx.Limits(
+            max_connections=Config.RETRIEVAL_MAX_CONCURRENCY,
+            max_keepalive_connections=Config.RETRIEVAL_MAX_CONCURRENCY
+        )
+        return httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            limits=limits,
+            timeout=Config.RETRIEVAL_TIMEOUT,
+            follow_redirects=True
+        )
+    
+    def async_client(self) -> httpx.AsyncClient:
+        """Return the async HTTP client shared by every run on the current event loop."""
+        # Connections belong to the loop that opened them, so a new loop gets a new client
+        loop = asyncio.get_running_loop()
+        with self._async_client_lock:
+            if self._async_client is None or self._async_client_loop is not loop:
+                if self._async_client is not None:
+                    self._close_async_client(self._async_client, self._async_client_loop)
+                self._async_client = self.create_async_client()
+                self._async_client_loop = loop
+                # The client's pool is shared by every run, so its fetch limit is too
+                self._fetch_limit = asyncio.Semaphore(Config.RETRIEVAL_MAX_CONCURRENCY)
+            return self._async_client
+    
+    def fetch_limit(self) -> asyncio.Semaphore:
+        """Global fetch limit of the current loop's client, shared by every run.
+        
+        Holding it while fetching keeps all runs together within the pool's
+        RETRIEVAL_MAX_CONCURRENCY connections, so no fetch waits on the pool
+        long enough to hit its timeout.
+        """
+        self.async_client()
+        return self._fetch_limit
+    
+    @staticmethod
+    def _close_async_client(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]):
+        """Close a client left behind by another event loop, on that loop while it still exists."""
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        
+        def close():
+            try:
+                if loop is None or loop.is_closed():
+                    # A closed loop leaves its sockets open; a fresh loop still frees them,
+                    # though the old transports complain that their loop is gone
+                    asyncio.run(client.aclose())
+                else:
+                    loop.run_until_complete(client.aclose())
+            except RuntimeError:
+                pass
+        
+        # The caller is inside a running loop, so the other loop runs on its own thread
+        threading.Thread(target=close, name="close-http-client", daemon=True).start()
+    
+    async def ascrape_url(self, client: httpx.AsyncClient, url: str,
+                          revalidate: bool = False) -> Optional[SourceContent]:
+        """Scrape and parse content from a URL using a shared async client.
+        
+        Page cache reads and writes (SQLite and JSON files) run in threads so
+        they never stall the other scrapes sharing the event loop.
+        """
         try:
-            from trafilatura import extract
-            content = extract(html)
-            if content:
-                chunks = self._chunk_text(content)
-                return SourceContent(
-                    url=url,
-                    title=self._extract_title_bs4(html),
-                    content=content,
-                    chunks=chunks,
-                    metadata={'method': 'trafilatura'}
+            entry, cached = await asyncio.to_thread(self._from_cache, url, revalidate)
+            if cached:
+                return cached
+            
+            response = await self._aget(client, url, self.cache.validators(entry) if self.cache else {})
+            if self.cache:
+                reused = await asyncio.to_thread(
+                    self._reuse_response, url, response.status_code, response.text, response.headers, entry
                 )
-        except ImportError:
-            print("Trafilatura not available, using BeautifulSoup")
+                if not reused and response.status_code == 304:
+                    # The cached object was evicted since the lookup, so fetch the page in full
+                    response = await self._aget(client, url, {})
+                    reused = await asyncio.to_thread(
+                        self._reuse_response, url, response.status_code, response.text, response.headers, None
+                    )
+                if reused:
+                    return reused
+            
+            content = await self._aextract(response.text, url)
+            if not self.cache or not content:
+                return content
+            return await asyncio.to_thread(self._finish_response, url, response.text, response.headers, content)
+            
         except Exception as e:
-            print(f"Trafilatura extraction failed: {e}")
-        
-        return None
+            print(f"Error scraping {url}: {e}")
+            return None
     
-    def _extract_with_bs4(self, html: str, url: str) -> SourceContent:
-        """Extract content using BeautifulSoup."""
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        for element in soup(['script', 'style', 'nav', 'footer']):
-            element.decompose()
+    def _get(self, url: str, headers: Dict[str, str]):
+        """GET a page, with conditional headers when revalidating; a 304 is not an error."""
+        response = self.session.get(url, headers={'User-Agent': USER_AGENT, **headers},
+                                    timeout=Config.RETRIEVAL_TIMEOUT)
+        self._record_fetch(len(response.content))
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+    
+    async def _aget(self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> httpx.Response:
+        """Async counterpart of _get on the shared client."""
+        response = await client.get(url, headers=headers)
+        self._record_fetch(len(response.content))
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+    
+    def _from_cache(self, url: str, revalidate: bool = False) -> Tuple[Optional[Dict[str, Any]], Optional[SourceContent]]:
+        """Return the cache entry for a URL, plus its content if it is still fresh."""
+        if not self.cache:
+            return None, None
         
-        title = self._extract_title_bs4(html)
-        content = self._extract_content_bs4(soup)
-        chunks = self._chunk_text(content)
+        entry = self.cache.lookup(url)
+        if entry and not revalidate and self.cache.is_fresh(entry):
+            content = self.cache.load(url, entry["content_hash"])
+            if content:
+                return entry, self._with_cache_status(content, "hit")
         
-        return SourceContent(
-            url=url,
-            title=title,
-            content=content,
-            chunks=chunks,
-            metadata={'method': 'beautifulsoup'}
-        )
+        return entry, None
     
-    def _extract_title_bs4(self, html: str) -> str:
-        """Extract page title using BeautifulSoup."""
-        soup = BeautifulSoup(html, 'html.parser')
-        title_tag = soup.find('title')
-        return title_tag.get_text().strip() if title_tag else "No Title"
-    
-    def _extract_content_bs4(self, soup: BeautifulSoup) -> str:
-        """Extract main content from page using BeautifulSoup."""
-        # Try to find main content areas
-        content_selectors = [
-            'article',
-            'main',
-            '.content',
-            '.main-content',
-            '#content',
-            '#main-content',
-            'div[role="main"]'
-        ]
+    def _reuse_response(self, url: str, status_code: int, html: str, headers, entry: Optional[Dict[str, Any]]) -> Optional[SourceContent]:
+        """Serve a response from the cache when it is a 304 or a body that was already extracted.
         
-        for selector in content_selectors:
-            element = soup.select_one(selector)
-            if element:
-                return element.get_text().strip()
+        Returns None for a 304 whose cached object is gone, so the caller can refetch the page.
+        """
+        if not self.cache:
+            return None
         
-        # Fallback to body
-        return soup.find('body').get_text().strip()
-    
-    def _chunk_text(self, text: str, chunk_size: int = 500) -> List[str]:
-        """Split text into manageable chunks."""
-        words = text.split()
-        chunks = []
-        current_chunk = []
+        if status_code == 304:
+            content = self.cache.load(url, entry["content_hash"]) if entry else None
+            if not content:
+                return None
+            self.cache.mark_revalidated(url, headers.get('ETag'), headers.get('Last-Modified'))
+            return self._with_cache_status(content, "revalidated")
+        
+        # Identical bodies seen under another URL skip extraction entirely
+        content_hash = self.cache.content_hash(html)
+        content = self.cache.load(url, content_hash)
+        if content:
+            self.cache.store(url, content_hash, content,
+                             headers.get('ETag'), headers.get('Last-Modified'))
+            return self._with_cache_status(content, "miss")
+        
+        return None
+    
+    def _finish_response(self, url: str, html: str, headers, content: Optional[SourceContent]) -> Optional[SourceContent]:
+        """Store freshly extracted content in the cache."""
+        if not self.cache or not content:
+            return content
         
-        for word in words:
-            current_chunk.append(word)
-            if len(' '.join(current_chunk)) >= chunk_size:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = []
+        self.cache.store(url, self.cache.content_hash(html), content,
+                         headers.get('ETag'), headers.get('Last-Modified'))
+        return self._with_cache_status(content, "miss")
+    
+    def _record_fetch(self, size: int):
+        """Count a page download against the current run's trace."""
+        record("pages_fetched")
+        record("bytes_fetched", size)
+    
+    def _with_cache_status(self, content: SourceContent, status: str) -> SourceContent:
+        """Copy content with its page cache outcome recorded in the metadata."""
+        record(f"page_cache_{status}")
+        return content.model_copy(update={"metadata": {**content.metadata, "cache": status}})
+    
+    def _extract(self, html: str, url: str) -> Optional[SourceContent]:
+        """Extract content in the worker pool, blocking until it finishes."""
+        for attempt in range(2):
+            try:
+                document = extract_in_pool(html, Config.EXTRACTION_TIMEOUT)
+                break
+            except FutureTimeoutError:
+                print(f"Extraction timed out for {url}")
+                return None
+            except BrokenProcessPool:
+                # The pool may have been restarted under this page because another one got stuck
+                if attempt:
+                    raise
         
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+        return SourceContent(url=url, **document) if document else None
+    
+    async def _aextract(self, html: str, url: str) -> Optional[SourceContent]:
+        """Extract content in the worker pool without blocking the event loop."""
+        for attempt in range(2):
+            try:
+                document = await aextract_in_pool(html, Config.EXTRACTION_TIMEOUT)
+                break
+            except asyncio.TimeoutError:
+                print(f"Extraction timed out for {url}")
+                return None
+            except BrokenProcessPool:
+                if attempt:
+                    raise
         
-        return chunks
\ No newline at end of file
+        return SourceContent(url=url, **document) if document else None
\ No newline at end of file